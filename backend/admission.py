@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+from metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """Base for requests turned away before doing work. status/retry_after feed the HTTP response."""
+    status = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class OverCapacity(AdmissionRejected):
+    """Every extraction slot is busy and the wait queue is full, or the wait timed out."""
+    status = 503
+
+
+class RateLimited(AdmissionRejected):
+    """The caller has used up their token bucket."""
+    status = 429
+
+
+class ExtractionGate:
+    """
+    Caps concurrent pdfminer runs in this process, with a short bounded wait queue in front.
+    A burst of large uploads then costs max_concurrent extractions' worth of CPU and memory;
+    the next max_waiting requests wait up to wait_timeout for a slot and the rest get a fast 503.
+    Like the bcrypt pool, the limit is per web process (workers x threads in total).
+    """
+
+    def __init__(self):
+        self.max_concurrent = 2
+        self.max_waiting = 8
+        self.wait_timeout = 5.0
+        self._active = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+    def configure(self, max_concurrent=None, max_waiting=None, wait_timeout=None):
+        """max_waiting=0 means no queue: reject as soon as every slot is busy."""
+        if max_concurrent:
+            self.max_concurrent = max_concurrent
+        if max_waiting is not None:
+            self.max_waiting = max_waiting
+        if wait_timeout is not None:
+            self.wait_timeout = wait_timeout
+
+    def acquire(self):
+        with self._cond:
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_waiting:
+                    metrics.inc('admission_rejected_total', (('reason', 'queue_full'),))
+                    raise OverCapacity("Server is busy analysing other resumes, try again shortly")
+                self._waiting += 1
+                started = time.monotonic()
+                try:
+                    admitted = self._cond.wait_for(lambda: self._active < self.max_concurrent, self.wait_timeout)
+                finally:
+                    self._waiting -= 1
+                metrics.observe('admission_wait_seconds', time.monotonic() - started)
+                if not admitted:
+                    metrics.inc('admission_rejected_total', (('reason', 'wait_timeout'),))
+                    raise OverCapacity("Server is busy analysing other resumes, try again shortly")
+            self._active += 1
+
+    def release(self):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def slot(self):
+        """Holds one extraction slot for the block; raises OverCapacity instead of entering."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting
+        }
+
+
+class TokenBucketLimiter:
+    """
+    One token bucket per caller: up to `burst` requests at once, refilled at `rate` per second.
+    Buckets that have refilled completely carry no information and are dropped once
+    more than max_keys are tracked, so memory stays bounded.
+    """
+
+    def __init__(self):
+        self.rate = 0.5
+        self.burst = 10
+        self.max_keys = 10000
+        self._buckets = {} # key -> [tokens, last refill (monotonic)]
+        self._lock = threading.Lock()
+
+    def configure(self, rate=None, burst=None, max_keys=None):
+        """rate=0 disables limiting."""
+        if rate is not None:
+            self.rate = rate
+        if burst:
+            self.burst = burst
+        if max_keys:
+            self.max_keys = max_keys
+        with self._lock:
+            self._buckets.clear()
+
+    def _prune(self, now):
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.rate >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+
+    def take(self, key, cost=1):
+        """Spends `cost` tokens from key's bucket, or raises RateLimited with the time until it could."""
+        if not self.rate:
+            return
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = self._buckets[key] = [float(self.burst), now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < cost:
+                bucket[0] = tokens
+                metrics.inc('admission_rejected_total', (('reason', 'rate_limit'),))
+                raise RateLimited("Too many uploads, slow down", retry_after=(cost - tokens) / self.rate)
+            bucket[0] = tokens - cost
+
+    def stats(self):
+        return {"tracked": len(self._buckets), "rate": self.rate, "burst": self.burst}
+
+
+extraction_gate = ExtractionGate()
+upload_limiter = TokenBucketLimiter()
+metrics.describe('admission_rejected_total', 'counter', "Uploads turned away before extraction, by reason.")
+metrics.describe('admission_wait_seconds', 'histogram', "Time uploads queued for an extraction slot.")
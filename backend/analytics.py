@@ -0,0 +1,232 @@
+import datetime
+
+from sqlalchemy import bindparam, func, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from catalog import job_index, sync_index
+from models import db, Job, Resume, SkillStat, ScoreBucket, DailyStat, JobMatchStat
+
+BUCKET_WIDTH = 10
+TOP_BUCKET = 100 // BUCKET_WIDTH # Perfect scores get a bucket of their own
+SCORE_KINDS = ('structure', 'ats')
+
+
+def snapshot(skills, structure_score, ats_score, created_at=None):
+    """What one resume contributes to the aggregates."""
+    return {
+        "day": (created_at or datetime.datetime.utcnow()).date(),
+        "skills": frozenset(skills or ()),
+        "structure": structure_score,
+        "ats": ats_score
+    }
+
+def resume_snapshot(resume):
+    """snapshot() of a Resume as it is now; any object with the Resume column names works."""
+    return snapshot(resume.skills_detected, resume.structure_score, resume.ats_score, resume.created_at)
+
+def bucket_of(score):
+    return min(int(score // BUCKET_WIDTH), TOP_BUCKET)
+
+
+class AnalyticsDelta:
+    """
+    Net change to the aggregate tables from a set of resume writes. Collect with add(),
+    then apply() inside the transaction that writes the resumes, so the totals commit
+    (or roll back) with the rows they count. Batch writers apply one delta per batch:
+    a few statements per table however many resumes it covers.
+    Match counts use the catalog as it is now; `flask rematch-resumes` recounts them
+    after postings change.
+    """
+
+    def __init__(self):
+        self.skills = {}   # (skill,) -> [resumes]
+        self.buckets = {}  # (kind, bucket) -> [resumes]
+        self.days = {}     # (day,) -> [resumes, structure_count, structure_sum, ats_count, ats_sum]
+        self.jobs = {}     # (job id,) -> [resumes, score_sum]
+        sync_index()
+
+    def _count(self, snap, sign):
+        day = self.days.setdefault((snap["day"],), [0, 0, 0.0, 0, 0.0])
+        day[0] += sign
+        for i, kind in enumerate(SCORE_KINDS):
+            score = snap[kind]
+            if score is not None:
+                self.buckets.setdefault((kind, bucket_of(score)), [0])[0] += sign
+                day[1 + 2 * i] += sign
+                day[2 + 2 * i] += sign * score
+        for skill in snap["skills"]:
+            self.skills.setdefault((skill,), [0])[0] += sign
+        for match in job_index.match(snap["skills"]):
+            job = self.jobs.setdefault((match["job"]["id"],), [0, 0.0])
+            job[0] += sign
+            job[1] += sign * match["score"]
+
+    def add(self, old, new):
+        """old/new: snapshot() before and after one resume write; old is None for a new resume."""
+        if old == new:
+            return
+        if old is not None:
+            self._count(old, -1)
+        if new is not None:
+            self._count(new, 1)
+
+    def apply(self):
+        _increment(SkillStat, ('skill',), ('resumes',), self.skills)
+        _increment(ScoreBucket, ('kind', 'bucket'), ('resumes',), self.buckets)
+        _increment(DailyStat, ('day',), ('resumes', 'structure_count', 'structure_sum', 'ats_count', 'ats_sum'), self.days)
+        _increment(JobMatchStat, ('job_id',), ('resumes', 'score_sum'), self.jobs)
+
+
+def _increment(model, key_names, value_names, rows):
+    """Adds rows {key tuple: deltas} to the table, creating rows it has not seen yet with zeros."""
+    rows = sorted((key, deltas) for key, deltas in rows.items() if any(deltas))
+    if not rows:
+        return
+    table = model.__table__
+    key_columns = [table.c[name] for name in key_names]
+
+    if len(key_columns) == 1:
+        lookup = key_columns[0].in_([key[0] for key, _ in rows])
+    else:
+        lookup = tuple_(*key_columns).in_([key for key, _ in rows])
+    existing = {tuple(r) for r in db.session.execute(select(*key_columns).where(lookup))}
+    for key, _ in rows:
+        if key in existing:
+            continue
+        # Rare (first resume of a day, a new skill or posting); a concurrent writer may win the race
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(table).values(**dict(zip(key_names, key)), **dict.fromkeys(value_names, 0)))
+        except IntegrityError:
+            pass
+
+    # One executemany; rows are sorted so concurrent writers lock them in the same order
+    stmt = (
+        update(table)
+        .where(*(column == bindparam('key_' + column.name) for column in key_columns))
+        .values({name: table.c[name] + bindparam('delta_' + name) for name in value_names})
+    )
+    db.session.execute(stmt, [
+        {
+            **{'key_' + name: value for name, value in zip(key_names, key)},
+            **{'delta_' + name: value for name, value in zip(value_names, deltas)}
+        }
+        for key, deltas in rows
+    ])
+
+def record_resume(old, new):
+    """One resume written in the current transaction (old=None when it is new)."""
+    delta = AnalyticsDelta()
+    delta.add(old, new)
+    delta.apply()
+
+
+# --- BACKFILL ---
+
+def rebuild(batch_size=1000):
+    """Recomputes every aggregate from the resumes table in one transaction. Returns the resume count."""
+    for model in (SkillStat, ScoreBucket, DailyStat, JobMatchStat):
+        db.session.query(model).delete()
+    delta = AnalyticsDelta()
+    count = 0
+    rows = db.session.query(
+        Resume.skills_detected, Resume.structure_score, Resume.ats_score, Resume.created_at
+    ).yield_per(batch_size)
+    for row in rows:
+        delta.add(None, resume_snapshot(row))
+        count += 1
+    delta.apply()
+    db.session.commit()
+    return count
+
+
+def recount_job_matches(match_lists):
+    """
+    Replaces the per-posting totals from one full match list per resume, e.g. from
+    bulk_match.rematch_all_resumes(). match_lists may be lazy; only the totals are kept.
+    """
+    jobs = {}
+    for resume_matches in match_lists:
+        for match in resume_matches:
+            job = jobs.setdefault((match["job"]["id"],), [0, 0.0])
+            job[0] += 1
+            job[1] += match["score"]
+    db.session.query(JobMatchStat).delete()
+    _increment(JobMatchStat, ('job_id',), ('resumes', 'score_sum'), jobs)
+    db.session.commit()
+
+
+# --- READ SIDE ---
+
+def _average(total, count):
+    return round(total / count, 1) if count else None
+
+def summary(top_skills=50, days=30):
+    """
+    Dashboard body for GET /analytics. Reads only the aggregate tables, whose size follows
+    the taxonomy, the catalog and the number of days, never the number of resumes.
+    """
+    totals = db.session.query(
+        func.sum(DailyStat.resumes), func.sum(DailyStat.structure_count), func.sum(DailyStat.structure_sum),
+        func.sum(DailyStat.ats_count), func.sum(DailyStat.ats_sum)
+    ).one()
+    resumes, structure_count, structure_sum, ats_count, ats_sum = (value or 0 for value in totals)
+
+    skills = (
+        SkillStat.query.filter(SkillStat.resumes > 0)
+        .order_by(SkillStat.resumes.desc(), SkillStat.skill).limit(top_skills).all()
+    )
+
+    histograms = {kind: [0] * (TOP_BUCKET + 1) for kind in SCORE_KINDS}
+    for row in ScoreBucket.query.all():
+        if row.kind in histograms and 0 <= row.bucket <= TOP_BUCKET:
+            histograms[row.kind][row.bucket] = row.resumes
+
+    since = datetime.datetime.utcnow().date() - datetime.timedelta(days=days - 1)
+    daily = DailyStat.query.filter(DailyStat.day >= since).order_by(DailyStat.day).all()
+
+    jobs = (
+        db.session.query(JobMatchStat, Job.title, Job.company)
+        .join(Job, Job.id == JobMatchStat.job_id)
+        .order_by(JobMatchStat.resumes.desc(), Job.id).all()
+    )
+
+    def histogram(counts):
+        return [
+            {"from": b * BUCKET_WIDTH, "to": min(b * BUCKET_WIDTH + BUCKET_WIDTH - 1, 100), "resumes": n}
+            for b, n in enumerate(counts)
+        ]
+
+    return {
+        "resumes": resumes,
+        "skills": [
+            {"skill": s.skill, "resumes": s.resumes, "share": round(s.resumes / resumes, 3) if resumes else 0}
+            for s in skills
+        ],
+        "scores": {
+            "structure": {"scored": structure_count, "average": _average(structure_sum, structure_count),
+                          "histogram": histogram(histograms["structure"])},
+            "ats": {"scored": ats_count, "average": _average(ats_sum, ats_count),
+                    "histogram": histogram(histograms["ats"])}
+        },
+        "daily": [
+            {
+                "day": d.day.isoformat(),
+                "resumes": d.resumes,
+                "structure_average": _average(d.structure_sum, d.structure_count),
+                "ats_average": _average(d.ats_sum, d.ats_count)
+            }
+            for d in daily
+        ],
+        "jobs": [
+            {
+                "job_id": stat.job_id,
+                "title": title,
+                "company": company,
+                "matched_resumes": stat.resumes,
+                "match_rate": round(stat.resumes / resumes, 3) if resumes else 0,
+                "average_match_score": _average(stat.score_sum, stat.resumes)
+            }
+            for stat, title, company in jobs
+        ]
+    }
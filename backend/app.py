@@ -1,222 +1,725 @@
+import base64
+import datetime
+import functools
+import hashlib
+import json
 import os
-from flask import Flask, jsonify, request
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+import click
+from flask import Blueprint, Flask, Response, abort, current_app, jsonify, request, stream_with_context
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 
 from config import Config
-from models import db, User, Resume, ResumePII
-# Import all analysis functions
-from utils import extract_text_from_pdf, analyze_resume_structure, analyze_ats_compatibility, extract_skills, match_jobs
-
-app = Flask(__name__)
-app.config.from_object(Config)
-
-
-# --- CONFIGURATION ---
-UPLOAD_FOLDER = 'uploads'
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-
-# Ensure instance folder exists for SQLite
-instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
-os.makedirs(instance_path, exist_ok=True)
-
-CORS(app)
-db.init_app(app)
-bcrypt = Bcrypt(app)
-jwt = JWTManager(app)
-
-with app.app_context():
+from models import db, User, Resume, ResumePII, enable_sqlite_pragmas
+from cache import LRUCache
+from metrics import metrics, stage, time_queries, init_app as init_metrics
+from passwords import password_hasher, HashingPoolFull
+from admission import extraction_gate, upload_limiter, AdmissionRejected
+from catalog import job_index, seed_catalog, sync_index, catalog_version
+from rules import RULES_VERSION
+import analytics
+from storage import upload_store, load_backend
+# Import all analysis functions (pdfminer itself is only imported on the first extraction)
+from utils import extract_pdf, extract_text_from_pdf, analyze_resume_structure, analyze_ats_compatibility, extract_skills, match_jobs, extraction_cache, set_extraction_limits
+from tasks import analysis_jobs, run_analysis, run_full_analysis
+
+# Extensions and per-process state, bound to the app in create_app()
+bcrypt = Bcrypt()
+jwt = JWTManager()
+# Optional per-process cache of GET bodies, keyed on (user, resume_version, ...)
+response_cache = LRUCache()
+
+api = Blueprint('api', __name__)
+
+
+def create_app(config_object=Config):
+    """
+    Application factory. Does no database I/O and does not import pdfminer, so workers
+    boot fast and `gunicorn --preload` can build the app once in the master
+    (see gunicorn.conf.py). Create the schema with `flask --app wsgi init-db`.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+
+    # Behind a proxy, request.remote_addr (the anonymous rate-limit key) would be the proxy itself
+    hops = app.config['PROXY_FIX_HOPS']
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+    # --- CONFIGURATION ---
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    # Ensure instance folder exists for SQLite
+    instance_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+    os.makedirs(instance_path, exist_ok=True)
+
+    # Repeat uploads/rescans of the same PDF reuse the cached text instead of re-running pdfminer
+    extraction_cache.configure(
+        maxsize=app.config['EXTRACT_CACHE_SIZE'],
+        cache_dir=app.config['EXTRACT_CACHE_DIR'],
+        max_bytes=app.config['EXTRACT_CACHE_MAX_BYTES'],
+        max_age=app.config['EXTRACT_CACHE_MAX_AGE']
+    )
+
+    # Huge or hostile PDFs stop at these limits instead of pinning a worker
+    set_extraction_limits(
+        max_pages=app.config['PDF_MAX_PAGES'],
+        max_chars=app.config['PDF_MAX_CHARS'],
+        time_budget=app.config['PDF_TIME_BUDGET'],
+        layout=app.config['PDF_LAYOUT']
+    )
+
+    # Async mode (?async=1) runs extraction + scoring in a bounded process pool
+    analysis_jobs.configure(
+        max_workers=app.config['ANALYSIS_WORKERS'],
+        max_pending=app.config['ANALYSIS_MAX_PENDING'],
+        result_ttl=app.config['ANALYSIS_RESULT_TTL'],
+        jobs_dir=app.config['ANALYSIS_JOBS_DIR']
+    )
+
+    # Uploads beyond the extraction slots wait briefly or get 503; each caller also has a token bucket
+    extraction_gate.configure(
+        max_concurrent=app.config['EXTRACT_MAX_CONCURRENT'],
+        max_waiting=app.config['EXTRACT_MAX_WAITING'],
+        wait_timeout=app.config['EXTRACT_WAIT_TIMEOUT']
+    )
+    upload_limiter.configure(rate=app.config['UPLOAD_RATE_PER_MIN'] / 60, burst=app.config['UPLOAD_RATE_BURST'])
+
+    # Saved uploads: one content-addressed copy per distinct file, reference-counted in the PII bind
+    upload_store.configure(
+        load_backend(app.config['UPLOAD_BACKEND'], app.config),
+        delete_grace=app.config['UPLOAD_DELETE_GRACE']
+    )
+
+    CORS(app)
+    enable_sqlite_pragmas(
+        wal=app.config['SQLITE_WAL'],
+        synchronous=app.config['SQLITE_SYNCHRONOUS'],
+        busy_timeout_ms=app.config['SQLITE_BUSY_TIMEOUT_MS'],
+        mmap_size=app.config['SQLITE_MMAP_SIZE']
+    )
+    db.init_app(app)
+    bcrypt.init_app(app)
+
+    # Hashing/verification run on a bounded bcrypt pool so sign-up bursts cannot tie up every web worker
+    password_hasher.configure(
+        bcrypt,
+        rounds=app.config['BCRYPT_LOG_ROUNDS'],
+        max_workers=app.config['PASSWORD_WORKERS'],
+        max_pending=app.config['PASSWORD_MAX_PENDING']
+    )
+    jwt.init_app(app)
+
+    response_cache.configure(maxsize=app.config['RESPONSE_CACHE_SIZE'], ttl=app.config['RESPONSE_CACHE_TTL'])
+    job_index.configure_cache(app.config['MATCH_CACHE_SIZE'])
+
+    # Per-request and per-stage timings for /metrics, plus the optional slow-request log
+    init_metrics(app, slow_request_ms=app.config['SLOW_REQUEST_MS'])
+    # SQL time per database, so the main and PII binds show up separately
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            time_queries(engine, bind_key or 'main')
+
+    app.register_blueprint(api)
+    app.cli.command('init-db')(init_db_command)
+    app.cli.command('reset-db')(reset_db_command)
+    app.cli.command('rebuild-analytics')(rebuild_analytics_command)
+    app.cli.command('rematch-resumes')(rematch_resumes_command)
+    app.cli.command('sweep-uploads')(sweep_uploads_command)
+    return app
+
+
+# --- SCHEMA (explicit, never at import) ---
+
+def init_database(drop=False):
+    """Creates missing tables (after dropping everything with drop=True) and seeds an empty catalog."""
+    if drop:
+        db.drop_all()
     db.create_all()
+    return seed_catalog()
+
+def init_db_command():
+    """Create missing tables and seed the internship catalog."""
+    print(f"Tables ready; seeded {init_database()} internship postings.")
+
+def reset_db_command():
+    """Drop and recreate every table (all data is lost)."""
+    print(f"Database reset; seeded {init_database(drop=True)} internship postings.")
+
+def rebuild_analytics_command():
+    """Recompute the /analytics aggregates from every stored resume."""
+    print(f"Analytics rebuilt from {analytics.rebuild()} resumes.")
+
+@click.option('--output', type=click.Path(dir_okay=False), help="Also write {resume_id: top matches} to this JSON file.")
+def rematch_resumes_command(output):
+    """Re-match every stored resume against the catalog (after postings change) and recount the per-posting analytics."""
+    # numpy is only needed here, so it is imported on first use
+    from bulk_match import rematch_all_resumes
+    sync_index()
+    top_k = current_app.config['MATCH_TOP_K']
+    out = open(output, 'w', encoding='utf-8') if output else None
+    count = 0
+
+    def match_lists():
+        # Streams the results: each resume's full list only lives until it is counted (and written)
+        nonlocal count
+        for resume_id, found in rematch_all_resumes():
+            if out:
+                out.write(('{' if not count else ', ') + f'"{resume_id}": {json.dumps(found[:top_k])}')
+            count += 1
+            yield found
+
+    try:
+        analytics.recount_job_matches(match_lists())
+        if out:
+            out.write('}' if count else '{}')
+    finally:
+        if out:
+            out.close()
+    print(f"Re-matched {count} resumes against {len(job_index.jobs)} postings.")
+
+def sweep_uploads_command():
+    """Delete stored uploads no resume references any more."""
+    print(f"Removed {upload_store.sweep()} unreferenced uploads.")
 
 # --- ROUTES ---
 
-@app.route('/register', methods=['POST'])
+def busy_response(message, status=503, retry_after=1):
+    response = jsonify({"error": message})
+    response.status_code = status
+    response.headers['Retry-After'] = str(retry_after)
+    return response
+
+@api.app_errorhandler(AdmissionRejected)
+def admission_rejected(e):
+    return busy_response(str(e), e.status, e.retry_after)
+
+@api.app_errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    limit = request.max_content_length
+    return jsonify({"error": f"Upload too large (limit {limit // (1024 * 1024)} MB)" if limit else "Upload too large"}), 413
+
+def rate_limited(fn):
+    """Spends one token from the caller's upload bucket (JWT identity, else client IP); 429 when empty."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        identity = get_jwt_identity()
+        upload_limiter.take(f"user:{identity}" if identity else f"ip:{request.remote_addr}")
+        return fn(*args, **kwargs)
+    return wrapper
+
+@api.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     if User.query.filter_by(email=data.get('email')).first():
         return jsonify({"error": "Email already exists"}), 400
-    hashed_password = bcrypt.generate_password_hash(data.get('password')).decode('utf-8')
+    try:
+        with stage('bcrypt'):
+            hashed_password = password_hasher.hash(data.get('password'))
+    except HashingPoolFull as e:
+        return busy_response(str(e))
     new_user = User(username=data.get('username'), email=data.get('email'), password_hash=hashed_password)
     try:
         db.session.add(new_user)
-        db.session.commit()
+        with stage('db_commit'):
+            db.session.commit()
         return jsonify({"message": "User registered successfully!"}), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-@app.route('/login', methods=['POST'])
+@api.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
     username = data.get('username')
     password = data.get('password')
     user = User.query.filter_by(username=username).first()
-    if user and bcrypt.check_password_hash(user.password_hash, password):
-        access_token = create_access_token(identity=user.id)
+    if not user:
+        return jsonify({"error": "Invalid credentials"}), 401
+    try:
+        with stage('bcrypt'):
+            valid = password_hasher.verify(user.password_hash, password)
+    except HashingPoolFull as e:
+        return busy_response(str(e))
+    if valid:
+        # BCRYPT_ROUNDS changed since this hash was made: upgrade it now that we know the password.
+        # Skipped (and retried on a later login) when the pool is busy.
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                with stage('bcrypt_rehash'):
+                    user.password_hash = password_hasher.hash(password)
+                db.session.commit()
+            except HashingPoolFull:
+                pass
+        access_token = create_access_token(identity=str(user.id))
         return jsonify({"token": access_token, "username": user.username}), 200
     return jsonify({"error": "Invalid credentials"}), 401
 
-@app.route('/profile', methods=['GET'])
+# --- CONDITIONAL GET (ETag / 304) ---
+def user_version(user_id):
+    """The user's resume_version, or None if the user does not exist. One primary-key lookup."""
+    return db.session.query(User.resume_version).filter_by(id=user_id).scalar()
+
+def bump_user_version(user_id):
+    # Runs inside the caller's transaction, so new resume data and the new version commit together
+    User.query.filter_by(id=user_id).update({User.resume_version: User.resume_version + 1})
+
+def conditional_json(key, build):
+    """
+    Serves a per-user GET view with a strong ETag derived from `key`, which must change
+    whenever the body can (it embeds the user's resume_version).
+    A matching If-None-Match gets 304 before build() runs any queries; otherwise the body
+    comes from the response cache or build(). build() may return an error tuple, which is not cached.
+    """
+    etag = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        body = response_cache.get(key) if response_cache.maxsize else None
+        if body is None:
+            body = build()
+            if not isinstance(body, dict):
+                return body
+            if response_cache.maxsize:
+                response_cache.set(key, body)
+        response = jsonify(body)
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def encode_cursor(resume):
+    raw = f"{resume.created_at.isoformat()}|{resume.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    created_at, resume_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+    return datetime.datetime.fromisoformat(created_at), int(resume_id)
+
+@api.route('/profile', methods=['GET'])
 @jwt_required()
 def get_user_profile():
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    if not user:
+    version = user_version(current_user_id)
+    if version is None:
         return jsonify({"error": "User not found"}), 404
+
+    limit = max(1, min(request.args.get('limit', current_app.config['PROFILE_PAGE_SIZE'], type=int), 100))
+    cursor = request.args.get('cursor')
+    return conditional_json(
+        ('profile', current_user_id, version, cursor, limit),
+        lambda: build_profile(current_user_id, cursor, limit)
+    )
+
+def build_profile(current_user_id, cursor, limit):
+    user = User.query.get(current_user_id)
     
-    # Get all resumes, sorted by newest first
-    resumes = Resume.query.filter_by(user_id=current_user_id).order_by(Resume.created_at.desc()).all()
+    # Newest first, one page at a time. Keyset pagination on (created_at, id) keeps
+    # every page an index range scan, however many scans the user has.
+    query = Resume.query.filter_by(user_id=current_user_id)
+    if cursor:
+        try:
+            cursor_created, cursor_id = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(db.or_(
+            Resume.created_at < cursor_created,
+            db.and_(Resume.created_at == cursor_created, Resume.id < cursor_id)
+        ))
+    resumes = query.order_by(Resume.created_at.desc(), Resume.id.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(resumes) > limit:
+        resumes = resumes[:limit]
+        next_cursor = encode_cursor(resumes[-1])
+
+    # Filenames for the whole page in one IN query against the PII DB (no N+1, no text dumps)
+    filenames = dict(
+        db.session.query(ResumePII.resume_id, ResumePII.original_filename)
+        .filter(ResumePII.resume_id.in_([r.id for r in resumes]))
+        .all()
+    ) if resumes else {}
     
     resume_list = []
     for r in resumes:
-        # Get filename safely from PII
-        filename = "Unknown File"
-        if r.pii:
-            filename = r.pii.original_filename
-
         resume_list.append({
             "id": r.id,
-            "filename": filename,
+            "filename": filenames.get(r.id, "Unknown File"),
             "date": r.created_at.strftime("%Y-%m-%d"),
             
             # Health Check Data
             "structure_score": r.structure_score,
-            "structure_feedback": eval(r.structure_feedback) if r.structure_feedback else [],
+            "structure_feedback": r.structure_feedback or [],
 
             # ATS Data
             "ats_score": r.ats_score,
-            "ats_feedback": eval(r.ats_feedback) if r.ats_feedback else [],
+            "ats_feedback": r.ats_feedback or [],
             
             # Skills Data (Privacy Safe)
-            "skills": eval(r.skills_detected) if r.skills_detected else []
+            "skills": r.skills_detected or []
         })
 
-    return jsonify({
+    return {
         "username": user.username,
         "email": user.email,
-        "resumes": resume_list
-    })
+        "resumes": resume_list,
+        "next_cursor": next_cursor
+    }
+
+# --- SHARED UPLOAD PIPELINE ---
+def wants_async():
+    # Opt-in per request: POST /analyze?async=1 returns 202 + job id instead of blocking
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+def finish_analysis(kind, user_id, filename, data, result):
+    """
+    Saves a finished analysis and its upload (logged-in users only; anonymous scans are
+    never stored) and builds the response body.
+    Used by the request thread in sync mode and by the job callback in async mode.
+    """
+    score = result["score"]
+    skills = result["skills"]
+    saved_status = False
+
+    if user_id:
+        new_resume = Resume(
+            user_id=user_id,
+            skills_detected=skills, # Save skills to Main DB
+            rules_version=RULES_VERSION
+        )
+        if kind == 'analyze':
+            new_resume.structure_score = score
+            new_resume.structure_feedback = result["feedback"]['missing']
+        else:
+            new_resume.ats_score = score
+            new_resume.ats_feedback = result["results"]['issues']
+        with stage('store_upload'):
+            key, size = upload_store.save(data)
+        # Attached through the relationship, so one flush inserts both rows and fills in resume_id
+        new_resume.pii = ResumePII(
+            original_filename=filename,
+            file_path=upload_store.location(key),
+            content_hash=key,
+            extracted_text_dump=result["text"]
+        )
+        db.session.add(new_resume)
+        upload_store.add_ref(key, size)
+        with stage('db_flush'):
+            db.session.flush()
+        bump_user_version(user_id)
+        with stage('analytics'):
+            analytics.record_resume(None, analytics.resume_snapshot(new_resume))
+        with stage('db_commit'):
+            db.session.commit()
+        saved_status = True
 
-# --- RESUME HEALTH CHECK (Upload New) ---
-@app.route('/analyze', methods=['POST'])
-@jwt_required(optional=True)
-def analyze_resume():
+    if kind == 'analyze':
+        return {
+            "score": score,
+            "present": result["feedback"]["present"],
+            "missing": result["feedback"]["missing"],
+            "is_saved": saved_status
+        }
+    return {
+        "score": score,
+        "results": result["results"],
+        "is_saved": saved_status
+    }
+
+def handle_upload(kind):
     if 'resume' not in request.files:
         return jsonify({"error": "Missing resume file"}), 400
     file = request.files['resume']
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
+
     current_user_id = get_jwt_identity()
-    
     filename = secure_filename(file.filename)
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
 
-    try:
-        resume_text = extract_text_from_pdf(file_path)
-        score, feedback = analyze_resume_structure(resume_text)
-        
-        # Extract Skills
-        skills = extract_skills(resume_text)
-        
-        saved_status = False
-        
-        if current_user_id:
-            new_resume = Resume(
-                user_id=current_user_id,
-                structure_score=score,
-                structure_feedback=str(feedback['missing']),
-                skills_detected=str(skills) # Save skills to Main DB
-            )
-            db.session.add(new_resume)
-            db.session.flush()
-
-            new_pii = ResumePII(
-                resume_id=new_resume.id,
-                original_filename=filename,
-                file_path=file_path,
-                extracted_text_dump=resume_text
-            )
-            db.session.add(new_pii)
-            db.session.commit()
-            saved_status = True
-        else:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+    # Werkzeug already spools the upload; read it once and analyze from memory.
+    # Anonymous uploads stay in memory throughout, extraction cache included.
+    data = file.read()
+    file_size = len(data)
+
+    # Anonymous scans always run inline: a job record would put their results on disk
+    if wants_async() and current_user_id:
+        app = current_app._get_current_object()
+
+        def on_done(result):
+            # Runs on the job finisher thread, outside any request
+            with app.app_context():
+                try:
+                    return finish_analysis(kind, current_user_id, filename, data, result)
+                except Exception:
+                    db.session.rollback()
+                    raise
+
+        job_id = analysis_jobs.submit(current_user_id, on_done, kind, data, file_size)
+        if job_id is None:
+            return busy_response("Analysis queue is full, try again shortly")
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
 
-        return jsonify({
-            "score": score,
-            "present": feedback["present"],
-            "missing": feedback["missing"],
-            "is_saved": saved_status
-        })
+    try:
+        # Waits for an extraction slot, or raises OverCapacity (503) before any work is done
+        with extraction_gate.slot():
+            result = run_analysis(kind, data, file_size, bool(current_user_id))
+        return jsonify(finish_analysis(kind, current_user_id, filename, data, result))
+    except AdmissionRejected:
+        raise
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+# --- RESUME HEALTH CHECK (Upload New) ---
+@api.route('/analyze', methods=['POST'])
+@jwt_required(optional=True)
+@rate_limited
+def analyze_resume():
+    return handle_upload('analyze')
+
 # --- ATS SCANNER (Upload New) ---
-@app.route('/ats-scan', methods=['POST'])
+@api.route('/ats-scan', methods=['POST'])
 @jwt_required(optional=True)
+@rate_limited
 def ats_scan():
-    if 'resume' not in request.files:
-        return jsonify({"error": "Missing resume file"}), 400
-    file = request.files['resume']
-    if file.filename == '':
-        return jsonify({"error": "No selected file"}), 400
-
-    current_user_id = get_jwt_identity()
-    filename = secure_filename(file.filename)
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(file_path)
-    file_size = os.path.getsize(file_path)
+    return handle_upload('ats')
 
-    try:
-        resume_text = extract_text_from_pdf(file_path)
-        score, results = analyze_ats_compatibility(resume_text, file_size)
-        
-        # Extract Skills
-        skills = extract_skills(resume_text)
-        
-        saved_status = False
-        if current_user_id:
-            new_resume = Resume(
-                user_id=current_user_id,
-                ats_score=score,
-                ats_feedback=str(results['issues']),
-                skills_detected=str(skills) # Save skills to Main DB
-            )
-            db.session.add(new_resume)
-            db.session.flush()
-
-            new_pii = ResumePII(
-                resume_id=new_resume.id,
+# --- ASYNC JOB STATUS ---
+@api.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def job_status(job_id):
+    job = analysis_jobs.get(job_id)
+    # Jobs are only visible to the user who submitted them
+    if not job or job["owner"] != get_jwt_identity():
+        return jsonify({"error": "Job not found"}), 404
+
+    body = {"job_id": job["id"], "status": job["status"]}
+    if job["status"] == "done":
+        body["result"] = job["result"]
+    elif job["status"] == "failed":
+        body["error"] = job["error"]
+    return jsonify(body)
+
+# --- BULK UPLOAD (Career centre cohorts) ---
+def list_bulk_files(temp_files):
+    """
+    [(filename, read)] for a zip ('archive') and/or a multi-file form ('resumes'), checked
+    against the upload limits before anything is inflated. read() returns one file's bytes,
+    so files are only loaded when they are about to be processed.
+    Flask closes request.files when the view returns, before a streamed response gets to
+    them, so the uploads are copied to temp files first; they are added to temp_files for
+    the caller to close.
+    """
+    max_files = current_app.config['BULK_MAX_FILES']
+    files = []
+
+    archive = request.files.get('archive')
+    if archive and archive.filename:
+        copy = tempfile.TemporaryFile()
+        temp_files.append(copy)
+        shutil.copyfileobj(archive.stream, copy)
+        zf = zipfile.ZipFile(copy)
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir() and info.filename.lower().endswith('.pdf')
+            and not info.filename.startswith('__MACOSX/')
+        ]
+        # Check declared sizes up front so a zip bomb is rejected before anything is inflated
+        if len(members) > max_files or sum(i.file_size for i in members) > current_app.config['BULK_MAX_UNZIPPED_BYTES']:
+            raise ValueError("Archive is too large")
+        files.extend(
+            (secure_filename(os.path.basename(info.filename)) or 'resume.pdf', functools.partial(zf.read, info))
+            for info in members
+        )
+
+    uploads = [file for file in request.files.getlist('resumes') if file.filename]
+    if len(files) + len(uploads) > max_files:
+        raise ValueError(f"At most {max_files} files per upload")
+    if uploads:
+        # One temp file for all of them; each read() seeks to its own range
+        spool = tempfile.TemporaryFile()
+        temp_files.append(spool)
+        for file in uploads:
+            offset = spool.tell()
+            shutil.copyfileobj(file.stream, spool)
+            read = functools.partial(_read_range, spool, offset, spool.tell() - offset)
+            files.append((secure_filename(file.filename) or 'resume.pdf', read))
+    return files
+
+def _read_range(f, offset, length):
+    f.seek(offset)
+    return f.read(length)
+
+def save_bulk_batch(user_id, batch):
+    """
+    Persists finished files with one flush: the unit of work inserts all Resume rows together
+    (ids come back in one round-trip), then all ResumePII rows with those ids, then one commit.
+    The uploads were stored while reading the request; their references are taken here.
+    """
+    resumes = [
+        Resume(
+            user_id=user_id,
+            structure_score=result["structure_score"],
+            structure_feedback=result["structure_feedback"]["missing"],
+            ats_score=result["ats_score"],
+            ats_feedback=result["ats_results"]["issues"],
+            skills_detected=result["skills"],
+            rules_version=RULES_VERSION,
+            pii=ResumePII(
                 original_filename=filename,
-                file_path=file_path,
-                extracted_text_dump=resume_text
+                file_path=upload_store.location(key),
+                content_hash=key,
+                extracted_text_dump=result["text"]
             )
-            db.session.add(new_pii)
-            db.session.commit()
-            saved_status = True
-        else:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+        )
+        for _, filename, (key, _), result in batch
+    ]
+    db.session.add_all(resumes)
+    upload_store.add_refs([stored for _, _, stored, _ in batch])
+    with stage('db_flush'):
+        db.session.flush()
+    # Read the ids before commit expires the rows, or each one costs a SELECT
+    saved = [{"index": index, "resume_id": resume.id} for resume, (index, _, _, _) in zip(resumes, batch)]
+    bump_user_version(user_id)
+    with stage('analytics'):
+        delta = analytics.AnalyticsDelta()
+        for resume in resumes:
+            delta.add(None, analytics.resume_snapshot(resume))
+        delta.apply()
+    with stage('db_commit'):
+        db.session.commit()
+    return saved
 
-        return jsonify({
-            "score": score,
-            "results": results,
-            "is_saved": saved_status
-        })
+@api.route('/bulk-analyze', methods=['POST'])
+@jwt_required()
+@rate_limited
+def bulk_analyze():
+    """
+    Streams one NDJSON line per file as soon as the pool finishes it, a "saved" line after
+    each batched commit, and a final summary line.
+    """
+    current_user_id = get_jwt_identity()
+    # Cohort archives may exceed MAX_CONTENT_LENGTH; set before request.files parses the body
+    request.max_content_length = current_app.config['BULK_MAX_UPLOAD_BYTES']
+    if 'archive' not in request.files and 'resumes' not in request.files:
+        return jsonify({"error": "Send a zip as 'archive' or PDFs as 'resumes'"}), 400
 
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": str(e)}), 500
+    temp_files = []
+
+    def close_temp_files():
+        for f in temp_files:
+            f.close()
+
+    try:
+        files = list_bulk_files(temp_files)
+    except (zipfile.BadZipFile, ValueError) as e:
+        close_temp_files()
+        return jsonify({"error": str(e)}), 400
+
+    # At most two files per pool worker are in flight (read, stored and queued), and they count
+    # against the async queue limit, so a big archive never sits in memory all at once
+    window = analysis_jobs.reserve(min(2 * analysis_jobs.max_workers, len(files)))
+    if files and not window:
+        close_temp_files()
+        return busy_response("Analysis queue is full, try again shortly")
+    executor = analysis_jobs.get_executor()
+
+    batch_size = current_app.config['BULK_BATCH_SIZE']
+    counts = {"saved": 0, "failed": 0}
+
+    def flush(batch):
+        try:
+            ids = save_bulk_batch(current_user_id, batch)
+        except Exception as e:
+            db.session.rollback()
+            counts["failed"] += len(batch)
+            return json.dumps({"error": str(e), "unsaved": [index for index, _, _, _ in batch]}) + "\n"
+        counts["saved"] += len(ids)
+        return json.dumps({"saved": ids}) + "\n"
+
+    remaining = enumerate(files)
+    running = {}
+    read_errors = []
+
+    def submit_next():
+        # Loads the next file, stores it and queues it; False once every file is queued
+        for index, (filename, read) in remaining:
+            try:
+                data = read()
+                stored = upload_store.save(data)
+            except Exception as e:
+                read_errors.append(json.dumps({"index": index, "filename": filename, "error": str(e)}) + "\n")
+                continue
+            running[executor.submit(run_full_analysis, data, len(data))] = (index, filename, stored)
+            return True
+        return False
+
+    def generate():
+        batch = []
+        while len(running) < window and submit_next():
+            pass
+        while True:
+            for line in read_errors:
+                counts["failed"] += 1
+                yield line
+            read_errors.clear()
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, filename, stored = running.pop(future)
+                submit_next() # Keep the window full while this result is handled
+                try:
+                    result = future.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    yield json.dumps({"index": index, "filename": filename, "error": str(e)}) + "\n"
+                    continue
+
+                yield json.dumps({
+                    "index": index,
+                    "filename": filename,
+                    "structure_score": result["structure_score"],
+                    "missing": result["structure_feedback"]["missing"],
+                    "ats_score": result["ats_score"],
+                    "issues": result["ats_results"]["issues"],
+                    "skills": result["skills"]
+                }) + "\n"
+
+                batch.append((index, filename, stored, result))
+                if len(batch) >= batch_size:
+                    yield flush(batch)
+                    batch = []
+
+        if batch:
+            yield flush(batch)
+
+        yield json.dumps({"done": True, "files": len(files), **counts}) + "\n"
+
+    def close():
+        # Runs when the response ends, also when the client goes away mid-stream
+        for future in running:
+            future.cancel()
+        analysis_jobs.release(window)
+        close_temp_files()
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.call_on_close(close)
+    return response
 
 # --- ATS RESCAN (Using History) ---
-@app.route('/ats-rescan/<int:resume_id>', methods=['POST'])
+@api.route('/ats-rescan/<int:resume_id>', methods=['POST'])
 @jwt_required()
+@rate_limited
 def ats_rescan(resume_id):
     current_user_id = get_jwt_identity()
 
@@ -231,30 +734,46 @@ def ats_rescan(resume_id):
         return jsonify({"error": "Original file not found in secure storage."}), 404
 
     try:
-        file_path = resume_pii.file_path
+        data = upload_store.read(resume_pii.content_hash, resume_pii.file_path)
         
         # Check if file exists
-        if not os.path.exists(file_path):
-             return jsonify({"error": "File missing from disk."}), 404
+        if data is None:
+             return jsonify({"error": "File missing from storage."}), 404
 
-        file_size = os.path.getsize(file_path)
+        file_size = len(data)
+        before = analytics.resume_snapshot(resume)
         
         # Prefer re-extracting to ensure fresh analysis
-        resume_text = extract_text_from_pdf(file_path)
+        with extraction_gate.slot():
+            extracted = extract_pdf(data)
+        resume_text = extracted["text"]
 
         # 4. Run ATS Logic
-        score, results = analyze_ats_compatibility(resume_text, file_size)
+        score, results = analyze_ats_compatibility(resume_text, file_size, extracted["truncated"], extracted.get("preflight"))
 
         # 5. UPDATE the existing Resume row
         resume.ats_score = score
-        resume.ats_feedback = str(results['issues'])
+        resume.ats_feedback = results['issues']
         
         # SELF-HEALING: If skills missing, extract and save
         if not resume.skills_detected:
             skills = extract_skills(resume_text)
-            resume.skills_detected = str(skills)
+            resume.skills_detected = skills
+
+        # The row is stamped with the current rules, so a stale structure score is redone too
+        if resume.rules_version != RULES_VERSION:
+            if resume.structure_score is not None:
+                structure_score, structure_feedback = analyze_resume_structure(resume_text)
+                resume.structure_score = structure_score
+                resume.structure_feedback = structure_feedback['missing']
+            resume.skills_detected = extract_skills(resume_text)
+        resume.rules_version = RULES_VERSION
             
-        db.session.commit()
+        bump_user_version(current_user_id)
+        with stage('analytics'):
+            analytics.record_resume(before, analytics.resume_snapshot(resume))
+        with stage('db_commit'):
+            db.session.commit()
 
         return jsonify({
             "score": score,
@@ -263,15 +782,52 @@ def ats_rescan(resume_id):
             "filename": resume_pii.original_filename
         })
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# --- DELETE A STORED RESUME ---
+@api.route('/resumes/<int:resume_id>', methods=['DELETE'])
+@jwt_required()
+def delete_resume(resume_id):
+    current_user_id = get_jwt_identity()
+    resume = Resume.query.filter_by(id=resume_id, user_id=current_user_id).first()
+    if not resume:
+        return jsonify({"error": "Resume not found or unauthorized"}), 404
+
+    before = analytics.resume_snapshot(resume)
+    key = resume.pii.content_hash if resume.pii else None
+    db.session.delete(resume) # Takes the PII row with it
+    last_ref = upload_store.release(key) if key else False
+    bump_user_version(current_user_id)
+    analytics.record_resume(before, None)
+    db.session.commit()
+
+    # Only once no committed row points at it. Files saved before content addressing may
+    # share their name (and so their path) with other resumes, so they are left alone
+    if last_ref:
+        upload_store.purge(key)
+    return jsonify({"message": "Resume deleted", "resume_id": resume_id})
+
 # --- INTERNSHIP MATCHING ---
-@app.route('/internship-match/<int:resume_id>', methods=['GET'])
+@api.route('/internship-match/<int:resume_id>', methods=['GET'])
 @jwt_required()
 def internship_match(resume_id):
     current_user_id = get_jwt_identity()
-    
+
+    # The result depends on the user's resumes and on the catalog. Both versions are read from the
+    # database, so every worker computes the same ETag, and a 304 costs two primary-key lookups;
+    # the index is only synced when the body has to be built
+    limit = request.args.get('limit', current_app.config['MATCH_TOP_K'], type=int)
+    return conditional_json(
+        ('internship-match', current_user_id, user_version(current_user_id), catalog_version(), resume_id, limit),
+        lambda: build_internship_match(current_user_id, resume_id, limit)
+    )
+
+def build_internship_match(current_user_id, resume_id, limit):
+    sync_index()
+
     # 1. Get Resume from Main DB
     resume = Resume.query.filter_by(id=resume_id, user_id=current_user_id).first()
     if not resume:
@@ -280,22 +836,105 @@ def internship_match(resume_id):
     # 2. Get Skills (Privacy Safe - No File Access Needed if already extracted)
     skills = []
     if resume.skills_detected:
-        skills = eval(resume.skills_detected)
+        skills = resume.skills_detected
     else:
         # Fallback: If old resume, fetch from PII and update
-        if resume.pii and os.path.exists(resume.pii.file_path):
-            text = extract_text_from_pdf(resume.pii.file_path)
+        data = upload_store.read(resume.pii.content_hash, resume.pii.file_path) if resume.pii else None
+        if data is not None:
+            before = analytics.resume_snapshot(resume)
+            # Same concurrency limit as every other extraction; OverCapacity becomes a 503
+            with extraction_gate.slot():
+                text = extract_text_from_pdf(data)
             skills = extract_skills(text)
-            resume.skills_detected = str(skills)
+            resume.skills_detected = skills
+            bump_user_version(current_user_id)
+            analytics.record_resume(before, analytics.resume_snapshot(resume))
             db.session.commit()
             
-    # 3. Find Matches
-    matches = match_jobs(skills)
+    # 3. Find Matches (top-k over postings sharing a skill)
+    matches = match_jobs(skills, limit=limit)
     
-    return jsonify({
+    return {
         "skills_detected": skills,
         "matches": matches
+    }
+
+# --- EMPLOYER: RANK STORED RESUMES FOR A POSTING ---
+@api.route('/internships/<int:job_id>/candidates', methods=['GET'])
+@jwt_required()
+def job_candidates(job_id):
+    user = User.query.get(get_jwt_identity())
+    if not user or user.email not in current_app.config['EMPLOYER_EMAILS']:
+        return jsonify({"error": "Employer access required"}), 403
+
+    # numpy is only needed here, so it is imported on first use
+    from bulk_match import rank_candidates
+
+    sync_index()
+    limit = request.args.get('limit', current_app.config['MATCH_TOP_K'], type=int)
+    # Scores every stored resume against the posting in one matrix product
+    candidates = rank_candidates(job_id, limit=limit)
+    if candidates is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({
+        "job_id": job_id,
+        "candidates": candidates
     })
 
+# --- ANALYTICS (read-only dashboard) ---
+@api.route('/analytics', methods=['GET'])
+@jwt_required()
+def analytics_summary():
+    user = User.query.get(get_jwt_identity())
+    if not user or user.email not in current_app.config['EMPLOYER_EMAILS']:
+        return jsonify({"error": "Employer access required"}), 403
+
+    # Served from the aggregate tables only, so the cost does not grow with the number of resumes
+    top = max(1, min(request.args.get('top', 50, type=int), 500))
+    days = max(1, min(request.args.get('days', 30, type=int), 366))
+    return jsonify(analytics.summary(top_skills=top, days=days))
+
+# --- METRICS (Prometheus text format) ---
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    token = current_app.config['METRICS_TOKEN']
+    if token and request.headers.get('Authorization') != f"Bearer {token}":
+        abort(404)
+
+    extraction = extraction_cache.stats()
+    responses = response_cache.stats()
+    matches = job_index.match_cache.stats()
+    match_lookups = matches["hits"] + matches["misses"]
+    jobs = analysis_jobs.stats()
+    hashing = password_hasher.stats()
+    gate = extraction_gate.stats()
+    limiter = upload_limiter.stats()
+    gauges = [
+        ('extraction_cache_hits', "Extraction cache hits by tier.", (('tier', 'memory'),), extraction["memory_hits"]),
+        ('extraction_cache_hits', "Extraction cache hits by tier.", (('tier', 'disk'),), extraction["disk_hits"]),
+        ('extraction_cache_misses', "Extractions that ran pdfminer.", (), extraction["misses"]),
+        ('extraction_cache_disk_evictions', "Disk cache entries expired or evicted by this process.", (), extraction["disk_evictions"]),
+        ('extraction_cache_entries', "Texts held in memory.", (), extraction["memory_size"]),
+        ('response_cache_hits', "GET bodies served from the response cache.", (), responses["hits"]),
+        ('response_cache_misses', "GET bodies built from the database.", (), responses["misses"]),
+        ('response_cache_entries', "Bodies held in the response cache.", (), responses["size"]),
+        ('match_cache_hits', "Job matches served from the skill-set memo.", (), matches["hits"]),
+        ('match_cache_misses', "Job matches computed from the index.", (), matches["misses"]),
+        ('match_cache_hit_ratio', "match_cache_hits / lookups since start.", (), round(matches["hits"] / match_lookups, 3) if match_lookups else 0),
+        ('match_cache_entries', "Skill sets held in the match memo.", (), matches["size"]),
+        ('analysis_jobs_pending', "Async analyses queued or running.", (), jobs["pending"]),
+        ('analysis_jobs_max_pending', "Async queue capacity.", (), jobs["max_pending"]),
+        ('password_pool_pending', "bcrypt calls running or queued.", (), hashing["pending"]),
+        ('password_pool_saturation', "password_pool_pending / queue limit.", (), round(hashing["pending"] / hashing["max_pending"], 3)),
+        ('extraction_slots_active', "Extractions running under the admission gate.", (), gate["active"]),
+        ('extraction_slots_waiting', "Uploads waiting for an extraction slot.", (), gate["waiting"]),
+        ('extraction_slots_max', "Concurrent extraction limit.", (), gate["max_concurrent"]),
+        ('extraction_queue_max', "Wait queue limit in front of the extraction slots.", (), gate["max_waiting"]),
+        ('upload_rate_limit_callers', "Callers with a partly used upload token bucket.", (), limiter["tracked"]),
+        ('job_index_postings', "Postings in the in-memory match index.", (), len(job_index.jobs)),
+    ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    create_app().run(debug=True, port=5000)
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Cold start and per-worker memory of the web app.
+
+    cd backend && python benchmarks/cold_start.py [--runs 5] [--workers 2] [--output FILE]
+
+1. Imports the app in fresh interpreters and reports import time, peak RSS and whether
+   pdfminer got loaded.
+2. Boots gunicorn with and without --preload, waits until it answers, sends each worker
+   an anonymous /ats-scan (so pdfminer is in use), and reads every worker's private and
+   proportional memory from /proc/<pid>/smaps_rollup (Linux only).
+
+Everything runs against throwaway SQLite files, the tree's instance/ is never touched.
+Results go to benchmarks/results/cold_start.json by default (not tracked by git).
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND, 'benchmarks'))
+
+from corpus import build_pdf
+
+IMPORT_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_ms": round(elapsed * 1000, 1),
+    "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    "modules": len(sys.modules),
+    "pdfminer_loaded": "pdfminer.pdfinterp" in sys.modules
+}}))
+"""
+
+
+def bench_import(stmt, runs, env):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-c', IMPORT_PROBE.format(stmt=stmt)],
+            cwd=env['BENCH_WORKDIR'], env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "stmt": stmt,
+        "import_ms_median": statistics.median(s["import_ms"] for s in samples),
+        "import_ms_min": min(s["import_ms"] for s in samples),
+        "max_rss_mb": statistics.median(s["max_rss_mb"] for s in samples),
+        "modules": samples[-1]["modules"],
+        "pdfminer_loaded": samples[-1]["pdfminer_loaded"]
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _memory_kb(pid):
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return {
+        "rss_mb": round(fields.get('Rss', 0) / 1024, 1),
+        "pss_mb": round(fields.get('Pss', 0) / 1024, 1),
+        "private_mb": round((fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)) / 1024, 1)
+    }
+
+def _children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(p) for p in f.read().split()]
+
+def _post_pdf(url, pdf):
+    boundary = 'benchboundary'
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="resume"; filename="cv.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'
+    ).encode() + pdf + f'\r\n--{boundary}--\r\n'.encode()
+    request = urllib.request.Request(url, data=body, headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        return response.status
+
+def bench_gunicorn(target, workers, preload, env):
+    port = _free_port()
+    cmd = [sys.executable, '-m', 'gunicorn', '--chdir', BACKEND, '-w', str(workers), '-b', f'127.0.0.1:{port}']
+    if preload:
+        cmd.append('--preload')
+        conf = os.path.join(BACKEND, 'gunicorn.conf.py')
+        if os.path.exists(conf):
+            cmd += ['-c', conf]
+    cmd.append(target)
+
+    started = time.perf_counter()
+    master = subprocess.Popen(cmd, cwd=env['BENCH_WORKDIR'], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    try:
+        url = f'http://127.0.0.1:{port}'
+        while True:
+            if master.poll() is not None:
+                raise RuntimeError(master.stderr.read().decode())
+            try:
+                urllib.request.urlopen(url + '/metrics', timeout=1)
+                break
+            except OSError:
+                time.sleep(0.02)
+        boot_ms = (time.perf_counter() - started) * 1000
+        while len(_children(master.pid)) < workers:
+            time.sleep(0.05)
+
+        idle = [_memory_kb(pid) for pid in _children(master.pid)]
+        pdf = build_pdf(2, 'text')
+        first_request_ms = None
+        # Connections are spread over workers by the kernel; a few rounds reach all of them
+        for _ in range(workers * 4):
+            t = time.perf_counter()
+            _post_pdf(url + '/ats-scan', pdf + os.urandom(8)) # Distinct bytes, so no cache hits
+            first_request_ms = first_request_ms or round((time.perf_counter() - t) * 1000, 1)
+        busy = [_memory_kb(pid) for pid in _children(master.pid)]
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+    return {
+        "target": target,
+        "preload": preload,
+        "workers": workers,
+        "boot_ms": round(boot_ms, 1),
+        "first_ats_scan_ms": first_request_ms,
+        "per_worker_idle": idle,
+        "per_worker_after_scans": busy,
+        "private_mb_after_scans_total": round(sum(m["private_mb"] for m in busy), 1),
+        "pss_mb_after_scans_total": round(sum(m["pss_mb"] for m in busy), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--import-stmt', default="import wsgi")
+    parser.add_argument('--target', default="wsgi:app")
+    parser.add_argument('--skip-gunicorn', action='store_true')
+    parser.add_argument('--output', default=os.path.join(BACKEND, 'benchmarks', 'results', 'cold_start.json'))
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    with tempfile.TemporaryDirectory(prefix='resume-cold-') as workdir:
+        env = dict(
+            os.environ,
+            PYTHONPATH=BACKEND,
+            BENCH_WORKDIR=workdir,
+            DB_URI_MAIN='sqlite:///' + os.path.join(workdir, 'main.db'),
+            DB_URI_PII='sqlite:///' + os.path.join(workdir, 'pii.db'),
+            EXTRACT_CACHE_DIR=os.path.join(workdir, 'extract_cache'),
+            ANALYSIS_JOBS_DIR=os.path.join(workdir, 'jobs')
+        )
+        # Schema first, so the measured imports do no schema work of their own
+        subprocess.run([sys.executable, '-m', 'flask', '--app', 'wsgi', 'init-db'],
+                       cwd=workdir, env=env, capture_output=True)
+
+        results = {"import": bench_import(args.import_stmt, args.runs, env)}
+        print(json.dumps(results["import"], indent=2))
+        if not args.skip_gunicorn:
+            results["gunicorn"] = []
+            for preload in (False, True):
+                run = bench_gunicorn(args.target, args.workers, preload, env)
+                results["gunicorn"].append(run)
+                print(json.dumps({k: v for k, v in run.items() if not k.startswith('per_worker')}, indent=2))
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+"""
+Deterministic synthetic resume PDFs for benchmarking, written without any PDF library.
+
+    cd backend && python benchmarks/corpus.py --out /tmp/corpus
+
+Kinds:
+  text    plain Helvetica text
+  images  the same text plus noisy image XObjects on every page (large files, LTImage work)
+  cid     text drawn with an Identity-H CID font without ToUnicode, which pdfminer
+          extracts as "(cid:N)" garbage
+  scanned one full-page image per page and no text at all, like a photographed CV
+"""
+import argparse
+import os
+import random
+import zlib
+
+PAGE_SIZES = (1, 2, 5, 10, 20)
+KINDS = ('text', 'images', 'cid', 'scanned')
+
+WORDS = ("python sql react flask docker aws excel communication leadership teamwork "
+         "designed built shipped analysed reduced improved mentored automated pipeline "
+         "dashboard service api latency students university project club volunteer").split()
+
+HEADER_LINES = [
+    "Ahmad Bin Ali",
+    "Kuala Lumpur, Malaysia | ahmad.ali@example.com | 012-3456789 | linkedin.com/in/ahmadali",
+    "PROFESSIONAL SUMMARY",
+    "Final year computer science student seeking a software engineering internship.",
+    "EDUCATION",
+    "Universiti Malaya - Bachelor of Computer Science, CGPA 3.71",
+    "EXPERIENCE",
+]
+FOOTER_LINES = [
+    "TECHNICAL SKILLS",
+    "Python, JavaScript, React, SQL, Docker, AWS, Flask",
+    "ACHIEVEMENTS",
+    "Dean's list award, hackathon certification",
+    "CO-CURRICULAR",
+    "Computer science society, volunteer tutor",
+    "REFERENCES",
+    "Available upon request",
+]
+LINES_PER_PAGE = 55
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def resume_lines(pages, rng):
+    """Header on page 1, filler experience bullets, skills/references at the very end."""
+    total = pages * LINES_PER_PAGE
+    body = total - len(HEADER_LINES) - len(FOOTER_LINES)
+    filler = ["- " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))) for _ in range(max(body, 0))]
+    return HEADER_LINES + filler + FOOTER_LINES
+
+
+class _PdfWriter:
+    def __init__(self):
+        self.objects = []
+
+    def add(self, body):
+        self.objects.append(body)
+        return len(self.objects)
+
+    def stream(self, data, extra=''):
+        compressed = zlib.compress(data)
+        return self.add(
+            f"<< /Length {len(compressed)} /Filter /FlateDecode {extra}>>\nstream\n".encode('latin-1')
+            + compressed + b"\nendstream"
+        )
+
+    def render(self, root):
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(self.objects, start=1):
+            offsets.append(len(out))
+            if isinstance(body, str):
+                body = body.encode('latin-1')
+            out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+        xref = len(out)
+        out += f"xref\n0 {len(self.objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            out += f"{offset:010d} 00000 n \n".encode()
+        out += f"trailer\n<< /Size {len(self.objects) + 1} /Root {root} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        return bytes(out)
+
+
+def build_pdf(pages, kind='text', seed=0):
+    """Returns the bytes of a `pages`-page resume of the given kind. Same arguments, same bytes."""
+    rng = random.Random(f"{kind}:{pages}:{seed}")
+    lines = resume_lines(pages, rng)
+    writer = _PdfWriter()
+
+    # Object 1 and 2 are reserved for the catalog and the page tree
+    writer.add('')
+    writer.add('')
+    helvetica = writer.add("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    fonts = f"/F1 {helvetica} 0 R"
+    if kind == 'cid':
+        descriptor = writer.add(
+            "<< /Type /FontDescriptor /FontName /Garbled /Flags 4 /FontBBox [0 -200 1000 900] "
+            "/ItalicAngle 0 /Ascent 900 /Descent -200 /CapHeight 700 /StemV 80 >>"
+        )
+        descendant = writer.add(
+            "<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Garbled "
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            f"/FontDescriptor {descriptor} 0 R /DW 500 >>"
+        )
+        cid_font = writer.add(
+            "<< /Type /Font /Subtype /Type0 /BaseFont /Garbled /Encoding /Identity-H "
+            f"/DescendantFonts [{descendant} 0 R] >>"
+        )
+        fonts += f" /F2 {cid_font} 0 R"
+
+    page_ids = []
+    for page_no in range(pages):
+        chunk = lines[page_no * LINES_PER_PAGE:(page_no + 1) * LINES_PER_PAGE]
+        ops = ["BT", "/F1 9 Tf", "13 TL", "50 800 Td"]
+        for i, line in enumerate(chunk):
+            if kind == 'cid' and i % 3 == 2:
+                # Glyph ids with no unicode mapping
+                glyphs = "".join(f"{rng.randint(3, 900):04x}" for _ in range(len(line) // 2))
+                ops += ["/F2 9 Tf", f"<{glyphs}> Tj T*", "/F1 9 Tf"]
+            else:
+                ops.append(f"({_escape(line)}) Tj T*")
+        ops.append("ET")
+
+        xobjects = ''
+        if kind == 'scanned':
+            # The "scan": noise the size of a low-resolution page photo, no text operators
+            pixels = rng.randbytes(200 * 280 * 3)
+            image = writer.stream(pixels, "/Type /XObject /Subtype /Image /Width 200 /Height 280 "
+                                          "/ColorSpace /DeviceRGB /BitsPerComponent 8 ")
+            ops = ["q", "595 0 0 842 0 0 cm", "/Im0 Do", "Q"]
+            xobjects = f" /XObject << /Im0 {image} 0 R >>"
+        elif kind == 'images':
+            names = []
+            for n in range(3):
+                # Noise does not compress, so every image really costs ~30 KB of stream
+                pixels = rng.randbytes(100 * 100 * 3)
+                image = writer.stream(pixels, "/Type /XObject /Subtype /Image /Width 100 /Height 100 "
+                                              "/ColorSpace /DeviceRGB /BitsPerComponent 8 ")
+                names.append(f"/Im{n} {image} 0 R")
+                ops += ["q", f"120 0 0 120 {400} {650 - n * 200} cm", f"/Im{n} Do", "Q"]
+            xobjects = f" /XObject << {' '.join(names)} >>"
+
+        content = writer.stream("\n".join(ops).encode('latin-1'))
+        page_ids.append(writer.add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {content} 0 R "
+            f"/Resources << /Font << {fonts} >>{xobjects} >> >>"
+        ))
+
+    writer.objects[0] = "<< /Type /Catalog /Pages 2 0 R >>"
+    writer.objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] /Count {pages} >>"
+    return writer.render(root=1)
+
+
+def build_corpus(page_sizes=PAGE_SIZES, kinds=KINDS, seed=0):
+    """{name: pdf bytes}, e.g. 'text-05p'."""
+    return {
+        f"{kind}-{pages:02d}p": build_pdf(pages, kind, seed)
+        for kind in kinds
+        for pages in page_sizes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for name, data in build_corpus(seed=args.seed).items():
+        with open(os.path.join(args.out, name + '.pdf'), 'wb') as f:
+            f.write(data)
+        print(f"{name}.pdf  {len(data) / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
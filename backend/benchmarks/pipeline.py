@@ -0,0 +1,216 @@
+"""
+Benchmark of the analysis pipeline, stage by stage and end to end through the Flask routes.
+
+    cd backend && python benchmarks/pipeline.py [--repeat 5] [--output FILE] [--compare old.json]
+
+Runs on the synthetic corpus from corpus.py against throwaway SQLite databases,
+so it never touches instance/ or uploads/. Extraction is timed cold (cache off)
+and warm; the endpoint runs also use a cold extraction cache.
+Results are written as JSON (default benchmarks/results/bench.json, not tracked by git);
+--compare prints the change against an earlier run.
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from corpus import build_corpus, PAGE_SIZES, KINDS
+
+REGRESSION_RATIO = 1.2
+
+
+def timed(fn, repeat):
+    """Runs fn `repeat` times and returns (summary in ms, last result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    summary = {
+        "min_ms": round(min(samples), 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3)
+    }
+    return summary, result
+
+
+# --- STAGES (no Flask, no DB) ---
+
+def bench_stages(corpus, repeat):
+    import utils
+    from cache import ExtractionCache
+    from catalog import DEFAULT_CATALOG, JobIndex
+
+    with open(DEFAULT_CATALOG, 'r', encoding='utf-8') as f:
+        index = JobIndex()
+        index.load([dict(posting, id=i) for i, posting in enumerate(json.load(f), start=1)])
+
+    no_cache = ExtractionCache(maxsize=0)
+    warm_cache = ExtractionCache()
+    results = {}
+    for name, data in corpus.items():
+        utils.extraction_cache = no_cache
+        row = {"bytes": len(data)}
+        row["extract_cold"], extracted = timed(lambda: utils.extract_pdf(data), repeat)
+
+        utils.extraction_cache = warm_cache
+        utils.extract_pdf(data)
+        row["extract_cached"], _ = timed(lambda: utils.extract_text_from_pdf(data), repeat)
+
+        text = extracted["text"]
+        row["chars"] = len(text)
+        row["truncated"] = extracted["truncated"]
+        row["analyze_resume_structure"], _ = timed(lambda: utils.analyze_resume_structure(text), repeat)
+        row["analyze_ats_compatibility"], _ = timed(
+            lambda: utils.analyze_ats_compatibility(text, len(data), extracted["truncated"]), repeat
+        )
+        row["extract_skills"], skills = timed(lambda: utils.extract_skills(text), repeat)
+        row["match_jobs"], _ = timed(lambda: utils.match_jobs(skills, index=index), repeat)
+        results[name] = row
+        print(f"  stages  {name:<12} extract {row['extract_cold']['median_ms']:>9.1f} ms")
+    return results
+
+
+# --- ENDPOINTS (Flask test client, temporary SQLite binds) ---
+
+def bench_endpoints(corpus, repeat, workdir):
+    os.environ['DB_URI_MAIN'] = 'sqlite:///' + os.path.join(workdir, 'main.db')
+    os.environ['DB_URI_PII'] = 'sqlite:///' + os.path.join(workdir, 'pii.db')
+    os.environ['EXTRACT_CACHE_DIR'] = os.path.join(workdir, 'extract_cache')
+    os.environ['UPLOAD_RATE_PER_MIN'] = '0' # Every timed upload comes from the one bench user
+    os.chdir(workdir) # create_app() creates ./uploads
+
+    import utils
+    from cache import ExtractionCache
+    from app import create_app, init_database, response_cache
+
+    app = create_app()
+    with app.app_context():
+        init_database()
+    utils.extraction_cache = ExtractionCache(maxsize=0)
+    client = app.test_client()
+    client.post('/register', json={"username": "bench", "email": "bench@example.com", "password": "bench"})
+    login = client.post('/login', json={"username": "bench", "password": "bench"})
+    headers = {"Authorization": f"Bearer {login.get_json()['token']}"}
+
+    def upload(path, name, data):
+        def call():
+            response = client.post(path, headers=headers,
+                                   data={"resume": (io.BytesIO(data), name + '.pdf')},
+                                   content_type='multipart/form-data')
+            assert response.status_code == 200, response.get_data(as_text=True)
+        return call
+
+    results = {}
+    for name, data in corpus.items():
+        row = {}
+        row["POST /analyze"], _ = timed(upload('/analyze', name, data), repeat)
+        row["POST /ats-scan"], _ = timed(upload('/ats-scan', name, data), repeat)
+        results[name] = row
+        print(f"  routes  {name:<12} /analyze {row['POST /analyze']['median_ms']:>8.1f} ms")
+
+    def profile():
+        response_cache.clear()
+        response = client.get('/profile', headers=headers)
+        assert response.status_code == 200
+        return response.headers['ETag']
+
+    profile_row, etag = timed(profile, repeat)
+
+    def revalidate():
+        response = client.get('/profile', headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+    revalidate_row, _ = timed(revalidate, repeat)
+    results["profile"] = {
+        "scans": 2 * repeat * len(corpus),
+        "GET /profile": profile_row,
+        "GET /profile (304)": revalidate_row
+    }
+    return results
+
+
+# --- OUTPUT ---
+
+def flatten(results):
+    """{"stages/text-05p/extract_cold": median_ms, ...}"""
+    flat = {}
+    for section in ('stages', 'endpoints'):
+        for doc, row in results.get(section, {}).items():
+            for metric, value in row.items():
+                if isinstance(value, dict):
+                    flat[f"{section}/{doc}/{metric}"] = value["median_ms"]
+    return flat
+
+def compare(old, new):
+    before, after = flatten(old), flatten(new)
+    regressions = 0
+    print(f"\n{'metric':<60}{'old ms':>10}{'new ms':>10}{'change':>9}")
+    for key in sorted(after):
+        if key not in before or not before[key]:
+            continue
+        ratio = after[key] / before[key]
+        flag = "  <-- slower" if ratio > REGRESSION_RATIO else ""
+        regressions += bool(flag)
+        print(f"{key:<60}{before[key]:>10.2f}{after[key]:>10.2f}{ratio:>8.2f}x{flag}")
+    print(f"\n{regressions} metric(s) more than {round((REGRESSION_RATIO - 1) * 100)}% slower.")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--pages', type=int, nargs='+', default=list(PAGE_SIZES))
+    parser.add_argument('--kinds', nargs='+', default=list(KINDS), choices=KINDS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-endpoints', action='store_true')
+    parser.add_argument('--output', default=os.path.join(BACKEND, 'benchmarks', 'results', 'bench.json'))
+    parser.add_argument('--compare', help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    import pdfminer
+
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    corpus = build_corpus(page_sizes=args.pages, kinds=args.kinds, seed=args.seed)
+
+    results = {
+        "meta": {
+            "created_at": datetime.datetime.now().isoformat(timespec='seconds'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pdfminer": pdfminer.__version__,
+            "repeat": args.repeat,
+            "seed": args.seed
+        }
+    }
+    print("Timing pipeline stages...")
+    results["stages"] = bench_stages(corpus, args.repeat)
+    if not args.skip_endpoints:
+        print("Timing endpoints...")
+        with tempfile.TemporaryDirectory(prefix='resume-bench-') as workdir:
+            results["endpoints"] = bench_endpoints(corpus, args.repeat, workdir)
+            os.chdir(BACKEND)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+    if baseline:
+        with open(baseline, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+
+if __name__ == '__main__':
+    main()
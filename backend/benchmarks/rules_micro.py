@@ -0,0 +1,140 @@
+"""
+Microbenchmark: legacy multi-scan scorers vs the compiled rule engine (rules.py).
+
+    cd backend && python benchmarks/rules_micro.py [--pages 1 5 20] [--repeat 20]
+
+Both implementations are run on the same synthetic resumes; the script also
+checks that they produce identical scores and feedback.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rules
+from utils import analyze_resume_structure, analyze_ats_compatibility
+
+
+# --- LEGACY IMPLEMENTATION (as it was before rules.py) ---
+
+def legacy_structure(text):
+    text = text.lower()
+    score = 0
+    feedback = {"present": [], "missing": []}
+
+    def check(found, points, present, missing=None):
+        nonlocal score
+        if found:
+            score += points
+            feedback["present"].append(present)
+        else:
+            feedback["missing"].append(missing or present)
+
+    check(re.search(r'[\w\.-]+@[\w\.-]+', text), 5, "Email Address")
+    check(re.search(r'(\+?6?01)[0-46-9]-*[0-9]{7,8}', text), 5, "Phone Number")
+    check("linkedin.com" in text, 5, "LinkedIn Profile")
+    check(any(loc in text for loc in ["malaysia", "kuala lumpur", "selangor", "penang", "johor", "kedah", "sarawak", "sabah"]), 10, "Location (State/Country)")
+    check(any(w in text for w in ["education", "academic", "university", "cgpa"]), 15, "Education Section")
+    check(any(w in text for w in ["experience", "internship", "employment", "work history"]), 15, "Work/Internship Experience")
+    check(any(w in text for w in ["summary", "objective", "profile", "about me"]), 10, "Professional Summary")
+    check(any(w in text for w in ["skills", "technologies", "technical", "programming", "languages"]), 10, "Technical Skills")
+    check(any(w in text for w in ["leadership", "communication", "teamwork", "problem solving", "soft skills"]), 5, "Soft Skills", "Soft Skills (Keywords)")
+    check(any(w in text for w in ["achievement", "award", "certification", "honor"]), 5, "Achievements/Certifications")
+    check(any(w in text for w in ["involvement", "co-curricular", "club", "society", "volunteer"]), 5, "Co-curricular Activities")
+    check("references" in text or "referees" in text, 10, "References")
+    return score, feedback
+
+def legacy_ats(text, file_size_bytes):
+    results = {"is_readable": True, "parsed_info": {}, "issues": [], "raw_text_preview": text[:500] + "..."}
+    if len(text.strip()) < 50 and file_size_bytes > 50000:
+        results["is_readable"] = False
+        results["issues"].append("CRITICAL: Text not selectable. This looks like an Image/Scan.")
+        return 0, results
+    email_match = re.search(r'[\w\.-]+@[\w\.-]+', text)
+    if email_match:
+        results["parsed_info"]["email"] = email_match.group(0)
+    else:
+        results["issues"].append("Parsing Error: Could not automatically detect Email.")
+    phone_match = re.search(r'(\+?6?01)[0-46-9]-*[0-9]{7,8}', text)
+    if phone_match:
+        results["parsed_info"]["phone"] = phone_match.group(0)
+    else:
+        results["issues"].append("Parsing Error: Could not automatically detect Phone Number.")
+    if text.count('(cid:') > 3:
+        results["issues"].append("Font Encoding Error: Your PDF uses fonts that turn into garbage text.")
+    if any(len(line) > 300 for line in text.split('\n')):
+        results["issues"].append("Formatting Warning: Some text lines are extremely long. Avoid complex tables.")
+    ats_score = 100
+    if not results["parsed_info"].get("email"): ats_score -= 25
+    if not results["parsed_info"].get("phone"): ats_score -= 25
+    if len(results["issues"]) > 0: ats_score -= (len(results["issues"]) * 10)
+    return max(0, ats_score), results
+
+
+# --- SYNTHETIC RESUMES ---
+
+FILLER = ("designed and shipped a data pipeline in python and sql for the analytics team "
+          "reduced report latency by forty percent while mentoring two junior developers").split()
+
+def make_resume(pages, seed, with_contacts=True, with_references=True):
+    """About 3000 chars per page; sections up front, long filler body, references last."""
+    rng = random.Random(seed)
+    parts = ["Ahmad Bin Ali", "Kuala Lumpur, Malaysia"]
+    if with_contacts:
+        parts += ["ahmad.ali@example.com | 012-3456789 | linkedin.com/in/ahmadali"]
+    parts += ["PROFESSIONAL SUMMARY", "Final year student seeking an internship.", "EDUCATION",
+              "Universiti Malaya, CGPA 3.71", "EXPERIENCE"]
+    body_chars = pages * 3000
+    while sum(len(p) for p in parts) < body_chars:
+        parts.append(" ".join(rng.choice(FILLER) for _ in range(rng.randint(8, 20))))
+    parts += ["TECHNICAL SKILLS", "Python, React, SQL", "Leadership and teamwork",
+              "AWARDS", "Dean's list", "CLUB ACTIVITIES", "Computer science society"]
+    if with_references:
+        parts += ["REFERENCES", "Available upon request"]
+    return "\n".join(parts)
+
+
+def bench(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, nargs='+', default=[1, 5, 20, 50])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'resume':<28}{'legacy ms':>12}{'engine ms':>12}{'speedup':>10}")
+    for pages in args.pages:
+        for label, kwargs in [("complete", {}), ("no contacts/refs", {"with_contacts": False, "with_references": False})]:
+            text = make_resume(pages, seed=pages, **kwargs)
+            assert legacy_structure(text) == analyze_resume_structure(text)
+            engine_ats = analyze_ats_compatibility(text, len(text))
+            engine_ats[1].pop("is_truncated") # Added after this benchmark's legacy snapshot
+            assert legacy_ats(text, len(text)) == engine_ats
+
+            def run_legacy():
+                legacy_structure(text)
+                legacy_ats(text, len(text))
+
+            def run_engine():
+                hits = rules.scan(text) # One scan shared by both scorers, as the upload paths do
+                analyze_resume_structure(text, hits)
+                analyze_ats_compatibility(text, len(text), hits=hits)
+
+            old = bench(run_legacy, args.repeat)
+            new = bench(run_engine, args.repeat)
+            print(f"{f'{pages}p {label}':<28}{old:>12.2f}{new:>12.2f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
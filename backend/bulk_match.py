@@ -0,0 +1,155 @@
+import itertools
+
+import numpy as np
+
+from catalog import job_index
+from models import Resume
+from skills import skill_taxonomy
+
+# Resume x job cells scored at once (a 16 MB float32 block); rows per block follow the catalog size
+BLOCK_CELLS = 4 * 1024 * 1024
+
+
+class SkillMatrix:
+    """
+    Resume x job scoring by matrix product.
+    Skills are columns of a shared vocabulary (the catalog's requirements), resumes and
+    jobs are 0/1 rows, so overlap = R @ J.T and score = overlap / requirement count.
+    Resumes are scored in blocks of block_rows() so memory stays flat however many there are.
+    """
+
+    def __init__(self, jobs):
+        # jobs: [(job dict, set of requirement keys)], as stored in JobIndex.jobs
+        self.jobs = [job for job, _ in jobs]
+        reqs = [req for _, req in jobs]
+        self.vocab = sorted(set().union(*reqs)) if reqs else []
+        self.columns = {skill: i for i, skill in enumerate(self.vocab)}
+
+        self.J = self.encode(reqs)
+        self.req_counts = self.J.sum(axis=1)
+
+    def encode(self, skill_lists):
+        """0/1 float32 rows; skills outside the vocabulary can never overlap, so they are dropped."""
+        M = np.zeros((len(skill_lists), len(self.vocab)), dtype=np.float32)
+        for row, skills in enumerate(skill_lists):
+            cols = [self.columns[s] for s in {skill_taxonomy.key(s) for s in skills} if s in self.columns]
+            M[row, cols] = 1
+        return M
+
+    def block_rows(self):
+        return max(1, BLOCK_CELLS // max(1, len(self.jobs)))
+
+    def scores(self, R):
+        """
+        Scores one block of resumes. Returns (rows, cols, score, overlap) for the pairs that
+        share at least one skill, in row-major order; every other pair scores 0.
+        """
+        # float32 matmul goes through BLAS and is exact for counts this small
+        overlap = R @ self.J.T
+        rows, cols = np.nonzero(overlap)
+        counts = overlap[rows, cols].astype(np.int64)
+        del overlap
+        # Same float arithmetic as match_jobs: int((len(overlap) / len(req)) * 100)
+        score = ((counts / self.req_counts[cols].astype(np.float64)) * 100).astype(np.int64)
+        return rows, cols, score, counts
+
+    def matched_skills(self, resume_row, job_col):
+        both = np.flatnonzero(resume_row * self.J[job_col])
+        return [self.vocab[i] for i in both]
+
+
+def resume_skills_query():
+    """(id, skills_detected) of every stored resume with detected skills, in id order."""
+    return Resume.query.with_entities(Resume.id, Resume.skills_detected).filter(
+        Resume.skills_detected.isnot(None)
+    ).order_by(Resume.id)
+
+def load_resume_skills():
+    """(resume ids, skill lists) for every stored resume with detected skills."""
+    rows = resume_skills_query().all()
+    return [r.id for r in rows], [r.skills_detected for r in rows]
+
+
+def iter_matches(items, limit=None, index=None):
+    """
+    Batch version of utils.match_jobs over (key, skill list) pairs: yields (key, matches)
+    with the same shape and ordering, one block of resumes per matrix product.
+    Only one block is held at a time, so items can be a lazy query of any size.
+    """
+    index = index or job_index
+    entries = index.snapshot()
+    matrix = SkillMatrix([entry for _, entry in entries])
+    job_ids = np.array([job_id for job_id, _ in entries], dtype=np.int64)
+
+    items = iter(items)
+    while True:
+        block = list(itertools.islice(items, matrix.block_rows()))
+        if not block:
+            return
+        R = matrix.encode([skills for _, skills in block])
+        rows, cols, score, _ = matrix.scores(R)
+        bounds = np.searchsorted(rows, np.arange(len(block) + 1))
+
+        for row, (key, _) in enumerate(block):
+            row_cols, row_score = cols[bounds[row]:bounds[row + 1]], score[bounds[row]:bounds[row + 1]]
+            # Best score first, ties in catalog (id) order
+            order = np.lexsort((job_ids[row_cols], -row_score))
+            if limit:
+                order = order[:limit]
+            yield key, [
+                {
+                    "job": matrix.jobs[row_cols[i]],
+                    "score": int(row_score[i]),
+                    "matched_skills": matrix.matched_skills(R[row], row_cols[i])
+                }
+                for i in order
+            ]
+
+def match_many(skill_lists, limit=None, index=None):
+    """One result list per input skill list (see iter_matches)."""
+    return [matches for _, matches in iter_matches(enumerate(skill_lists), limit, index)]
+
+def rematch_all_resumes(limit=None, index=None, batch_size=1000):
+    """
+    Yields (resume_id, matches) for every stored resume, e.g. after a catalog update.
+    Resumes are streamed from the database and matched block by block.
+    """
+    rows = resume_skills_query().yield_per(batch_size)
+    return iter_matches(((r.id, r.skills_detected) for r in rows), limit, index)
+
+def rank_candidates(job_id, limit=20, index=None):
+    """
+    Top stored resumes for one posting: [{"resume_id", "score", "matched_skills"}].
+    Returns None if the posting is not in the catalog.
+    """
+    index = index or job_index
+    entry = index.jobs.get(job_id)
+    if entry is None:
+        return None
+
+    matrix = SkillMatrix([entry])
+    resume_ids, skill_lists = load_resume_skills()
+    if not resume_ids:
+        return []
+
+    # One job column, so the whole resume table is a single narrow block
+    R = matrix.encode(skill_lists)
+    hits, _, score, _ = matrix.scores(R)
+
+    ids = np.array(resume_ids, dtype=np.int64)
+    # One sortable key: best score first, ties by resume id
+    key = -score * (int(ids.max()) + 1) + ids[hits]
+    if limit and len(hits) > limit:
+        # O(n) partial selection before sorting just the winners
+        keep = np.argpartition(key, limit - 1)[:limit]
+        hits, score, key = hits[keep], score[keep], key[keep]
+    order = np.argsort(key)
+
+    return [
+        {
+            "resume_id": resume_ids[hits[i]],
+            "score": int(score[i]),
+            "matched_skills": matrix.matched_skills(R[hits[i]], 0)
+        }
+        for i in order
+    ]
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Small thread-safe LRU map with optional TTL.
+    Keeps hit/miss counters so callers can report cache effectiveness.
+    """
+
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            self.ttl = ttl or None
+            self._data.clear()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[0] if entry is not None else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache for PDF extraction results.
+    Tier 1 is an in-process LRU, tier 2 is a directory of JSON files shared by all workers.
+    Keys are sha256(extractor version + file bytes), so a changed extractor never serves stale text.
+    The disk tier is bounded: entries unread for max_age seconds expire, and once it holds more
+    than max_bytes the least recently used entries go (0 = no limit).
+    """
+
+    # Prune at least this often (seconds) while writing, even if max_bytes is not near
+    PRUNE_INTERVAL = 3600
+
+    def __init__(self, maxsize=256, cache_dir=None, max_bytes=0, max_age=0):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self.misses = 0
+        self._written = 0 # bytes written to disk since the last prune
+        self._last_prune = 0
+        self._prune_lock = threading.Lock()
+
+    def configure(self, maxsize=None, cache_dir=None, max_bytes=None, max_age=None):
+        if maxsize is not None:
+            self.memory = LRUCache(maxsize=maxsize)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.cache_dir = cache_dir
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        if max_age is not None:
+            self.max_age = max_age
+
+    def options(self):
+        """configure() arguments reproducing this cache, e.g. in a pool worker."""
+        return {
+            "maxsize": self.memory.maxsize,
+            "cache_dir": self.cache_dir,
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age
+        }
+
+    @staticmethod
+    def key_for(data, version):
+        digest = hashlib.sha256(version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        # Shard on the first two hex chars so one directory never holds every entry
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                if self.max_age and time.time() - os.path.getmtime(path) > self.max_age:
+                    os.unlink(path)
+                    value = None
+                else:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = json.load(f)
+                    os.utime(path) # The mtime is the entry's last use, for expiry and eviction
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key, value, persist=True):
+        """persist=False keeps the entry in this process only (anonymous uploads never reach disk)."""
+        self.memory.set(key, value)
+        if not persist or not self.cache_dir:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so concurrent readers never see half an entry
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+                self._written += f.tell()
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing extraction cache: {e}")
+            return
+
+        if (self.max_bytes and self._written >= self.max_bytes // 10) or \
+                time.time() - self._last_prune > self.PRUNE_INTERVAL:
+            self.prune()
+
+    def prune(self):
+        """
+        Deletes expired disk entries, then the least recently used ones until the tier is
+        under 90% of max_bytes. Every worker may prune; they only ever delete whole files.
+        Returns the number of entries removed.
+        """
+        if not self.cache_dir or not self._prune_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            entries = []
+            for shard in os.scandir(self.cache_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+
+            # Oldest first: expired entries come before the rest, so stop at the first keeper
+            entries.sort()
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * 0.9
+            removed = 0
+            for mtime, size, path in entries:
+                expired = self.max_age and now - mtime > self.max_age
+                if not expired and not (self.max_bytes and total > target):
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            self.disk_evictions += removed
+            self._written = 0
+            self._last_prune = now
+            return removed
+        finally:
+            self._prune_lock.release()
+
+    def stats(self):
+        return {
+            "memory_hits": self.memory.hits,
+            "disk_hits": self.disk_hits,
+            "disk_evictions": self.disk_evictions,
+            "misses": self.misses,
+            "memory_size": len(self.memory),
+        }
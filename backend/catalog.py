@@ -0,0 +1,256 @@
+import heapq
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from cache import LRUCache
+from models import db, Job, JobSkill, JobChange, CatalogVersion
+from skills import skill_taxonomy
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'internships.json')
+
+# JobChange ids are handed out at insert but transactions commit in any order, so an id below
+# the last one applied can still appear later. Such gaps are re-read on every sync until they
+# show up or GAP_TIMEOUT seconds pass (a rolled-back insert leaves a gap for good).
+GAP_TIMEOUT = 300
+GAP_WINDOW = 100 # How far below the newest id gaps are tracked
+
+
+class JobIndex:
+    """
+    In-memory inverted index over the internship catalog: skill key -> posting ids.
+    A lookup only touches postings that share at least one skill with the resume,
+    so its cost follows the resume's skills rather than the catalog size.
+    Results are memoized per skill set: many resumes list the same few skills.
+    """
+
+    def __init__(self, cache_size=1024):
+        self.jobs = {}       # id -> (job dict, frozenset of requirement keys)
+        self.postings = {}   # skill key (see SkillTaxonomy.key) -> set of job ids
+        self.version = 0     # highest JobChange id applied
+        self.gaps = {}       # lower JobChange ids not seen yet -> when they were first missed
+        self.loaded = False
+        # Bumped by every change to the index and part of each memo key, so a result
+        # computed against the old catalog can never be served after a change
+        self.generation = 0
+        self.match_cache = LRUCache(maxsize=cache_size)
+        self._lock = threading.Lock()
+
+    def configure_cache(self, maxsize):
+        """0 disables memoization."""
+        self.match_cache.configure(maxsize=maxsize)
+
+    def _changed(self):
+        self.generation += 1
+        self.match_cache.clear()
+
+    def _remove(self, job_id):
+        entry = self.jobs.pop(job_id, None)
+        if entry is None:
+            return
+        for skill in entry[1]:
+            ids = self.postings.get(skill)
+            if ids is not None:
+                ids.discard(job_id)
+                if not ids:
+                    del self.postings[skill]
+
+    def _add(self, job):
+        self._remove(job["id"])
+        req = frozenset(skill_taxonomy.key(r) for r in job["req"])
+        self.jobs[job["id"]] = (job, req)
+        for skill in req:
+            self.postings.setdefault(skill, set()).add(job["id"])
+
+    def add(self, job):
+        """Adds or replaces one posting: {"id", "title", "company", "req": [...]}."""
+        with self._lock:
+            self._add(job)
+            self._changed()
+
+    def remove(self, job_id):
+        with self._lock:
+            self._remove(job_id)
+            self._changed()
+
+    def load(self, jobs, version=0):
+        """Replaces the whole index, e.g. from the DB on first use."""
+        with self._lock:
+            self.jobs = {}
+            self.postings = {}
+            for job in jobs:
+                self._add(job)
+            self.version = version
+            self.loaded = True
+            self._changed()
+
+    def snapshot(self):
+        """[(id, (job dict, requirements))] in id order, for batch matching."""
+        with self._lock:
+            return sorted(self.jobs.items())
+
+    def match(self, user_skills, limit=None):
+        """
+        Same result shape as the old mock matcher, best score first.
+        Ties keep catalog (id) order. With a limit, only the top `limit` are selected (heap).
+        The returned list may be shared with other callers through the memo; do not modify it.
+        """
+        user_skills_set = set([skill_taxonomy.key(s) for s in user_skills])
+        # Canonical signature: sorted matching keys, so "JS, react" and "React, Javascript" share an entry
+        memo_key = (self.generation, tuple(sorted(user_skills_set)), limit)
+        if self.match_cache.maxsize:
+            cached = self.match_cache.get(memo_key)
+            if cached is not None:
+                return cached
+
+        with self._lock:
+            # Count overlaps by walking the posting lists of the user's skills
+            overlap_counts = {}
+            for skill in user_skills_set:
+                for job_id in self.postings.get(skill, ()):
+                    overlap_counts[job_id] = overlap_counts.get(job_id, 0) + 1
+
+            scored = [
+                (int((count / len(self.jobs[job_id][1])) * 100), -job_id)
+                for job_id, count in overlap_counts.items()
+            ]
+            if limit:
+                top = heapq.nlargest(limit, scored)
+            else:
+                top = sorted(scored, reverse=True)
+
+            matches = []
+            for match_score, neg_id in top:
+                job, job_req_set = self.jobs[-neg_id]
+                matches.append({
+                    "job": job,
+                    "score": match_score,
+                    "matched_skills": list(user_skills_set.intersection(job_req_set))
+                })
+            if self.match_cache.maxsize and memo_key[0] == self.generation:
+                self.match_cache.set(memo_key, matches)
+            return matches
+
+
+job_index = JobIndex()
+
+
+# --- DB <-> INDEX (need an app context) ---
+
+def job_to_dict(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "company": job.company,
+        "req": [s.skill for s in job.skills]
+    }
+
+def _find_gaps(seen, low, high, now, gaps):
+    """gaps plus the ids in (low, high] missing from seen, within GAP_WINDOW of high."""
+    gaps = dict(gaps)
+    for change_id in range(max(low, high - GAP_WINDOW) + 1, high + 1):
+        if change_id not in seen:
+            gaps.setdefault(change_id, now)
+    return gaps
+
+def sync_index(index=job_index):
+    """
+    Brings the index up to date with the catalog tables.
+    First call loads everything; later calls replay only JobChange rows not seen yet,
+    including late commits below the newest id (see GAP_TIMEOUT).
+    """
+    now = time.time()
+    if not index.loaded:
+        # Read the log position first: anything committed after it is replayed next time
+        last_change = db.session.query(db.func.max(JobChange.id)).scalar() or 0
+        recent = {
+            change_id for (change_id,) in
+            db.session.query(JobChange.id).filter(JobChange.id > last_change - GAP_WINDOW)
+        }
+        jobs = Job.query.options(selectinload(Job.skills)).all()
+        index.load([job_to_dict(j) for j in jobs], version=last_change)
+        index.gaps = _find_gaps(recent, 0, last_change, now, {})
+        return
+
+    gaps = {change_id: missed for change_id, missed in index.gaps.items() if now - missed < GAP_TIMEOUT}
+    unseen = JobChange.id > index.version
+    if gaps:
+        unseen = or_(unseen, JobChange.id.in_(sorted(gaps)))
+    changes = JobChange.query.filter(unseen).order_by(JobChange.id).all()
+    seen = {c.id for c in changes}
+    gaps = {change_id: missed for change_id, missed in gaps.items() if change_id not in seen}
+    if not changes:
+        index.gaps = gaps
+        return
+
+    job_ids = {c.job_id for c in changes}
+    live = {
+        j.id: j for j in
+        Job.query.options(selectinload(Job.skills)).filter(Job.id.in_(job_ids)).all()
+    }
+    for job_id in job_ids:
+        # The DB is the source of truth, so replaying a change twice is harmless
+        if job_id in live:
+            index.add(job_to_dict(live[job_id]))
+        else:
+            index.remove(job_id)
+    version = max(index.version, changes[-1].id)
+    index.gaps = _find_gaps(seen, index.version, version, now, gaps)
+    index.version = version
+
+def catalog_version():
+    """Committed catalog version, 0 before the first change. One primary-key lookup."""
+    return db.session.query(CatalogVersion.version).filter_by(id=1).scalar() or 0
+
+def _log_change(job_id, removed=False):
+    db.session.add(JobChange(job_id=job_id, removed=removed))
+    updated = CatalogVersion.query.filter_by(id=1).update(
+        {CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False
+    )
+    if updated:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(CatalogVersion(id=1, version=1))
+    except IntegrityError:
+        # Another first change created the row
+        CatalogVersion.query.filter_by(id=1).update(
+            {CatalogVersion.version: CatalogVersion.version + 1}, synchronize_session=False
+        )
+
+def add_job(title, company, skills, commit=True):
+    job = Job(title=title, company=company, skills=[JobSkill(skill=s) for s in skills])
+    db.session.add(job)
+    db.session.flush()
+    _log_change(job.id)
+    if commit:
+        db.session.commit()
+        sync_index()
+    return job
+
+def remove_job(job_id):
+    job = db.session.get(Job, job_id)
+    if not job:
+        return False
+    db.session.delete(job)
+    _log_change(job_id, removed=True)
+    db.session.commit()
+    sync_index()
+    return True
+
+def seed_catalog(path=DEFAULT_CATALOG):
+    """Loads the bundled postings into an empty catalog. Returns how many were added."""
+    if Job.query.first() is not None:
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        postings = json.load(f)
+    for posting in postings:
+        add_job(posting["title"], posting["company"], posting["req"], commit=False)
+    db.session.commit()
+    sync_index()
+    return len(postings)
@@ -14,13 +14,120 @@ def fix_sqlite_uri(uri):
             return 'sqlite:///' + os.path.join(basedir, part)
     return uri
 
+def _flag(value):
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def engine_options(bind):
+    """
+    Pool settings for one bind from DB_<BIND>_POOL_SIZE etc., falling back to DB_POOL_SIZE etc.
+    Unset options keep SQLAlchemy's defaults.
+    """
+    options = {}
+    for option, env, cast in (
+        ('pool_size', 'POOL_SIZE', int),
+        ('max_overflow', 'MAX_OVERFLOW', int),
+        ('pool_timeout', 'POOL_TIMEOUT', int),
+        ('pool_recycle', 'POOL_RECYCLE', int),
+        ('pool_pre_ping', 'POOL_PRE_PING', _flag),
+    ):
+        value = os.getenv(f'DB_{bind}_{env}', os.getenv(f'DB_{env}'))
+        if value not in (None, ''):
+            options[option] = cast(value)
+    return options
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = fix_sqlite_uri(os.getenv('DB_URI_MAIN'))
     SQLALCHEMY_BINDS = {
-        'pii_db': fix_sqlite_uri(os.getenv('DB_URI_PII'))
+        'pii_db': {'url': fix_sqlite_uri(os.getenv('DB_URI_PII')), **engine_options('PII')}
     }
+    # e.g. DB_POOL_SIZE=10 DB_MAX_OVERFLOW=5 DB_POOL_RECYCLE=1800 DB_POOL_PRE_PING=1 (both binds),
+    # or DB_MAIN_POOL_SIZE / DB_PII_POOL_SIZE to size them separately
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options('MAIN')
+
+    # Applied to every SQLite connection: WAL lets readers and one writer work concurrently,
+    # busy_timeout waits for a lock instead of failing with "database is locked"
+    SQLITE_WAL = _flag(os.getenv('SQLITE_WAL', '1'))
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # NEW: Secret key for JWT tokens
-    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'fallback_secret_key_change_me')
\ No newline at end of file
+    JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'fallback_secret_key_change_me')
+
+    # bcrypt cost (Flask-Bcrypt reads BCRYPT_LOG_ROUNDS). Changing it rehashes passwords on next login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    # bcrypt runs on its own thread pool; calls beyond PASSWORD_MAX_PENDING get 503 + Retry-After
+    PASSWORD_WORKERS = int(os.getenv('PASSWORD_WORKERS', '2'))
+    PASSWORD_MAX_PENDING = int(os.getenv('PASSWORD_MAX_PENDING', '16'))
+
+    # PDF text extraction cache (in-process LRU + shared disk tier)
+    EXTRACT_CACHE_SIZE = int(os.getenv('EXTRACT_CACHE_SIZE', '256'))
+    EXTRACT_CACHE_DIR = os.getenv('EXTRACT_CACHE_DIR', os.path.join(basedir, 'instance', 'extract_cache'))
+    # Disk tier bounds: total size, and how long an unread entry is kept (0 = unbounded)
+    EXTRACT_CACHE_MAX_BYTES = int(os.getenv('EXTRACT_CACHE_MAX_MB', '512')) * 1024 * 1024
+    EXTRACT_CACHE_MAX_AGE = int(os.getenv('EXTRACT_CACHE_MAX_AGE_DAYS', '7')) * 86400
+
+    # Async analysis jobs (POST /analyze?async=1, GET /jobs/<id>)
+    ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '2'))
+    ANALYSIS_MAX_PENDING = int(os.getenv('ANALYSIS_MAX_PENDING', '16'))
+    ANALYSIS_RESULT_TTL = int(os.getenv('ANALYSIS_RESULT_TTL', '600'))
+    # Job records, shared by every web worker so any of them can answer GET /jobs/<id>
+    ANALYSIS_JOBS_DIR = os.getenv('ANALYSIS_JOBS_DIR', os.path.join(basedir, 'instance', 'jobs'))
+
+    # Internship matching returns at most this many postings (override with ?limit=)
+    MATCH_TOP_K = int(os.getenv('MATCH_TOP_K', '20'))
+    # Memoized match results, keyed on the resume's skill set (0 disables); cleared on catalog changes
+    MATCH_CACHE_SIZE = int(os.getenv('MATCH_CACHE_SIZE', '1024'))
+
+    # Accounts allowed to rank candidates for a posting (comma-separated emails)
+    EMPLOYER_EMAILS = {e.strip() for e in os.getenv('EMPLOYER_EMAILS', '').split(',') if e.strip()}
+
+    # Resumes per /profile page (clients follow next_cursor for more)
+    PROFILE_PAGE_SIZE = int(os.getenv('PROFILE_PAGE_SIZE', '50'))
+
+    # GET /profile and /internship-match body cache (0 disables; ETag/304 works either way)
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+    # POST /bulk-analyze limits and insert batch size
+    BULK_MAX_FILES = int(os.getenv('BULK_MAX_FILES', '200'))
+    BULK_MAX_UNZIPPED_BYTES = int(os.getenv('BULK_MAX_UNZIPPED_BYTES', str(200 * 1024 * 1024)))
+    BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', '25'))
+
+    # Uploads are stored content-addressed at UPLOAD_FOLDER/ab/cd/<sha256>.pdf, one copy per distinct file.
+    # UPLOAD_BACKEND: "local", or "package.module:Class" for another storage.StorageBackend
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
+    UPLOAD_BACKEND = os.getenv('UPLOAD_BACKEND', 'local')
+    # A blob losing its last reference is only deleted if it was not saved again in the last
+    # UPLOAD_DELETE_GRACE seconds; `flask sweep-uploads` removes the ones left behind
+    UPLOAD_DELETE_GRACE = int(os.getenv('UPLOAD_DELETE_GRACE', '600'))
+
+    # Request bodies above these sizes get 413 before they are read (bulk uploads have their own cap)
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+    BULK_MAX_UPLOAD_BYTES = int(os.getenv('BULK_MAX_UPLOAD_BYTES', str(100 * 1024 * 1024)))
+
+    # Admission control for uploads: at most EXTRACT_MAX_CONCURRENT extractions per web process,
+    # EXTRACT_MAX_WAITING more may wait up to EXTRACT_WAIT_TIMEOUT seconds, the rest get 503 + Retry-After
+    EXTRACT_MAX_CONCURRENT = int(os.getenv('EXTRACT_MAX_CONCURRENT', '2'))
+    EXTRACT_MAX_WAITING = int(os.getenv('EXTRACT_MAX_WAITING', '8'))
+    EXTRACT_WAIT_TIMEOUT = float(os.getenv('EXTRACT_WAIT_TIMEOUT', '5'))
+    # Per-caller token bucket on upload endpoints (JWT identity, or client IP when anonymous):
+    # UPLOAD_RATE_BURST uploads at once, refilled at UPLOAD_RATE_PER_MIN; beyond that 429. 0 disables
+    UPLOAD_RATE_PER_MIN = float(os.getenv('UPLOAD_RATE_PER_MIN', '30'))
+    UPLOAD_RATE_BURST = int(os.getenv('UPLOAD_RATE_BURST', '10'))
+    # Reverse proxies in front of the app (e.g. 1 on Render). Their X-Forwarded-For/-Proto/-Host
+    # headers are trusted that many hops deep, so the client IP above is the caller's, not the proxy's
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', '0'))
+
+    # PDF extraction limits (0 = unlimited). PDF_LAYOUT: default | fast | off
+    PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '10'))
+    PDF_MAX_CHARS = int(os.getenv('PDF_MAX_CHARS', '100000'))
+    PDF_TIME_BUDGET = float(os.getenv('PDF_TIME_BUDGET', '10'))
+    PDF_LAYOUT = os.getenv('PDF_LAYOUT', 'default')
+
+    # Requests slower than this are logged with their stage breakdown (0 = off)
+    SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '0'))
+    # When set, GET /metrics requires "Authorization: Bearer <token>"
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
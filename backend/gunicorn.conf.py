@@ -0,0 +1,25 @@
+# gunicorn -c gunicorn.conf.py wsgi:app
+#
+# The app is built once in the master and workers are forked from it, so the
+# interpreter, Flask, SQLAlchemy, pdfminer and the compiled rule/skill tables are
+# shared copy-on-write instead of being loaded again by every worker.
+# create_app() opens no database connections, so no socket is shared across the fork.
+import gc
+import os
+
+preload_app = True
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+# With threads > 1 a worker serves requests concurrently; EXTRACT_MAX_CONCURRENT caps extractions per worker
+threads = int(os.getenv('GUNICORN_THREADS', '1'))
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before the first fork
+    import numpy # noqa: F401 (bulk_match)
+    import utils
+    utils.load_pdfminer()
+
+    # Objects that exist now are never collected; moving them out of the GC's reach stops
+    # collections in the workers from writing to (and so copying) the shared pages
+    gc.freeze()
@@ -0,0 +1,191 @@
+"""
+Imports an archive of resume PDFs straight into the databases, without going through HTTP:
+
+    python ingest.py /path/to/archive [--user-email careers@uni.edu] [--batch-size 200] [--workers 8]
+
+PDFs are found recursively and handled in sorted path order. Extraction and scoring run on
+every core in a process pool; each batch is stored with one bulk INSERT per table (resumes
+on the main bind, resume_pii on the PII bind; on MySQL resumes go in row by row to get their
+ids) and one commit. After each commit a checkpoint
+file records the last path handled, so running the same command after a crash picks up
+where the last commit left off. Rows keep the absolute path of the source file, so leave the
+archive in place if the resumes should stay rescannable.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import insert
+
+import utils
+from analytics import AnalyticsDelta, snapshot
+from app import create_app, db
+from models import User, Resume, ResumePII, pack_text
+from rules import RULES_VERSION
+from tasks import init_worker, run_ingest
+
+
+def find_pdfs(root):
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.') and d != '__MACOSX']
+        paths.extend(os.path.join(dirpath, name) for name in filenames if name.lower().endswith('.pdf'))
+    return sorted(paths)
+
+def default_checkpoint(root, instance_path):
+    digest = hashlib.sha256(root.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(instance_path, f'ingest-{digest}.json')
+
+def load_checkpoint(path, root):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if state.get("root") == root else {}
+
+def save_checkpoint(path, state):
+    # Temp file + rename, so a crash mid-write leaves the previous checkpoint intact
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+def already_stored(paths):
+    rows = db.session.query(ResumePII.file_path).filter(ResumePII.file_path.in_(paths)).all()
+    return {r.file_path for r in rows}
+
+def insert_resumes(rows):
+    """
+    Inserts Resume rows and returns their ids in the same order. One statement where the
+    dialect can return ids in parameter order (SQLite, PostgreSQL); MySQL has no RETURNING,
+    so there each row is inserted on its own and its generated key read back.
+    """
+    dialect = db.session.get_bind(Resume).dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        return db.session.scalars(insert(Resume).returning(Resume.id, sort_by_parameter_order=True), rows).all()
+    return [db.session.execute(insert(Resume).values(**row)).inserted_primary_key[0] for row in rows]
+
+def insert_batch(user_id, batch, check_stored=False):
+    """
+    Stores [(path, run_full_analysis result)] with one INSERT per table and one commit.
+    check_stored first drops paths already in resume_pii. Returns the number of rows written.
+    """
+    if check_stored:
+        stored = already_stored([path for path, _ in batch])
+        batch = [(path, result) for path, result in batch if path not in stored]
+        if not batch:
+            return 0
+
+    resume_ids = insert_resumes([{
+        "user_id": user_id,
+        "structure_score": result["structure_score"],
+        "structure_feedback": result["structure_feedback"]["missing"],
+        "ats_score": result["ats_score"],
+        "ats_feedback": result["ats_results"]["issues"],
+        "skills_detected": result["skills"],
+        "rules_version": RULES_VERSION
+    } for _, result in batch])
+    db.session.execute(insert(ResumePII), [{
+        "resume_id": resume_id,
+        "original_filename": os.path.basename(path),
+        "file_path": path,
+        "extracted_text_packed": pack_text(result["text"])
+    } for resume_id, (path, result) in zip(resume_ids, batch)])
+    if user_id:
+        User.query.filter_by(id=user_id).update({User.resume_version: User.resume_version + 1})
+    delta = AnalyticsDelta()
+    for _, result in batch:
+        delta.add(None, snapshot(result["skills"], result["structure_score"], result["ats_score"]))
+    delta.apply()
+    db.session.commit()
+    return len(batch)
+
+def _duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+def ingest(root, checkpoint, user_id=None, batch_size=200, workers=None):
+    """Returns the checkpoint state after the run: {"root", "last_path", "saved", "failed"}."""
+    paths = find_pdfs(root)
+    state = load_checkpoint(checkpoint, root) or {"root": root, "last_path": None, "saved": 0, "failed": 0}
+    if state["last_path"]:
+        paths = [p for p in paths if p > state["last_path"]]
+        print(f"Resuming after {state['last_path']} ({state['saved']} saved, {state['failed']} failed so far)")
+    total = len(paths)
+    print(f"{total} PDFs to ingest")
+
+    workers = workers or os.cpu_count() or 1
+    # Same limits and extraction cache as the web workers, so a rerun after a crash does not
+    # extract the unsaved tail again and later rescans of these files are cache hits
+    initargs = (utils.extraction_cache.options(), dict(utils.extraction_limits))
+    started = time.time()
+    done = 0
+    batch = []
+    # A crash between a commit and its checkpoint write leaves that batch stored already. Only
+    # the first batch of a run can overlap such a commit, so only it is checked: file_path is
+    # not indexed, and the lookup would scan resume_pii on every batch
+    first_batch = True
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as pool:
+        results = pool.map(run_ingest, paths, chunksize=max(1, batch_size // (workers * 4)))
+        for path, result in zip(paths, results):
+            done += 1
+            if "error" in result:
+                state["failed"] += 1
+                print(f"  failed: {path}: {result['error']}", file=sys.stderr)
+            else:
+                batch.append((path, result))
+
+            if done % batch_size and done < total:
+                continue
+            if batch:
+                state["saved"] += insert_batch(user_id, batch, check_stored=first_batch)
+                first_batch = False
+            state["last_path"] = path
+            save_checkpoint(checkpoint, state)
+            batch = []
+
+            elapsed = max(time.time() - started, 1e-6)
+            rate = done / elapsed
+            print(f"  {done}/{total} files, {state['saved']} saved, {state['failed']} failed"
+                  f" ({rate:.1f} files/s, eta {_duration((total - done) / rate)})")
+
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('root', help="directory to scan for PDFs (recursively)")
+    parser.add_argument('--user-email', help="account the resumes belong to; default: no owner")
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--checkpoint', help="default: instance/ingest-<hash of root>.json")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    if not os.path.isdir(root):
+        parser.error(f"{root} is not a directory")
+
+    app = create_app()
+    checkpoint = args.checkpoint or default_checkpoint(root, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance'))
+    with app.app_context():
+        user_id = None
+        if args.user_email:
+            user = User.query.filter_by(email=args.user_email).first()
+            if not user:
+                parser.error(f"No user with email {args.user_email}")
+            user_id = user.id
+
+        started = time.time()
+        state = ingest(root, checkpoint, user_id, args.batch_size, args.workers)
+        print(f"Done in {_duration(time.time() - started)}: {state['saved']} resumes stored, "
+              f"{state['failed']} failed. Checkpoint: {checkpoint}")
+
+
+if __name__ == '__main__':
+    main()
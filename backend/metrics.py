@@ -0,0 +1,185 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+# Seconds; covers a sub-millisecond rule scan up to a pdfminer run near its time budget
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    """
+    In-process counters and histograms, rendered in the Prometheus text format.
+    Each web process keeps its own numbers (scrape every worker, or sum them);
+    work done inside the analysis pool is not visible here.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counters = {}    # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> [bucket counts..., sum, count]
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, text):
+        self.help[name] = (kind, text)
+
+    def inc(self, name, labels=(), value=1):
+        key = (name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=()):
+        key = (name, labels)
+        with self._lock:
+            row = self.histograms.get(key)
+            if row is None:
+                row = self.histograms[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    def clear(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def render(self, gauges=()):
+        """Prometheus exposition text. gauges: [(name, help, labels, value)] read at scrape time."""
+        lines = []
+        seen = set()
+
+        def header(name, kind, text):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, list(row)) for key, row in self.histograms.items())
+
+        for (name, labels), value in counters:
+            header(name, *self.help.get(name, ('counter', name)))
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for (name, labels), row in histograms:
+            header(name, *self.help.get(name, ('histogram', name)))
+            cumulative = 0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {row[-1]}")
+            lines.append(f"{name}_sum{_labels(labels)} {row[-2]:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {row[-1]}")
+
+        for name, text, labels, value in gauges:
+            header(name, 'gauge', text)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+metrics = Metrics()
+metrics.describe('stage_duration_seconds', 'histogram', "Time spent in one pipeline stage.")
+metrics.describe('http_request_duration_seconds', 'histogram', "Request time from routing to response.")
+metrics.describe('http_requests_total', 'counter', "Requests served.")
+metrics.describe('db_query_duration_seconds', 'histogram', "Time spent in one SQL statement, by database bind.")
+
+
+# --- STAGE TIMING ---
+
+@contextmanager
+def stage(name):
+    """
+    Times a block as `name`, labelled with the current endpoint ("background" outside a request).
+    Inside a request the timing is also kept on flask.g for the slow-request log.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if has_request_context():
+            endpoint = request.endpoint or 'unknown'
+            g.setdefault('stages', []).append((name, elapsed))
+        else:
+            endpoint = 'background'
+        metrics.observe('stage_duration_seconds', elapsed, (('endpoint', endpoint), ('stage', name)))
+
+def timed(name):
+    """Decorator form of stage()."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- SQL TIMING (per bind) ---
+
+def time_queries(engine, bind):
+    """
+    Times every statement run on `engine` as db_query_duration_seconds, labelled with the
+    endpoint and `bind`. Stages like db_flush/db_commit span both databases; this tells them apart.
+    Inside a request the per-bind totals are also kept on flask.g for the slow-request log.
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_query(conn, cursor, statement, parameters, context, executemany):
+        context.query_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _record_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context.query_started
+        if has_request_context():
+            endpoint = request.endpoint or 'unknown'
+            totals = g.setdefault('db_seconds', {})
+            totals[bind] = totals.get(bind, 0) + elapsed
+        else:
+            endpoint = 'background'
+        metrics.observe('db_query_duration_seconds', elapsed, (('endpoint', endpoint), ('bind', bind)))
+
+
+# --- REQUEST TIMING (wired up by init_app) ---
+
+def init_app(app, slow_request_ms=0):
+    """Records every request's duration; with slow_request_ms > 0, logs slower ones with their stages."""
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unknown'
+        metrics.observe('http_request_duration_seconds', elapsed, (('endpoint', endpoint), ('method', request.method)))
+        metrics.inc('http_requests_total', (('endpoint', endpoint), ('method', request.method), ('status', str(response.status_code))))
+
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            timings = g.get('stages', []) + [(f"sql[{bind}]", seconds) for bind, seconds in g.get('db_seconds', {}).items()]
+            breakdown = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings)
+            app.logger.warning(
+                "Slow request: %s %s -> %s in %.1fms [%s]",
+                request.method, request.path, response.status_code, elapsed * 1000, breakdown or "no stages"
+            )
+        return response
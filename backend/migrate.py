@@ -0,0 +1,183 @@
+"""
+One-off data migrations for existing databases. Safe to re-run.
+
+    python migrate.py columns        # add columns introduced since the tables were created
+    python migrate.py json-columns
+    python migrate.py compress-text  # after `columns`
+    python migrate.py store-uploads  # after `columns`
+"""
+import argparse
+import ast
+import json
+
+from sqlalchemy import inspect, text
+
+from app import create_app, db
+from models import Resume, ResumePII, pack_text
+from storage import upload_store
+
+JSON_COLUMNS = ('structure_feedback', 'ats_feedback', 'skills_detected')
+
+
+def add_missing_columns():
+    """
+    create_all() never alters existing tables, so new model columns are added here.
+    New columns must be nullable or carry a server_default.
+    """
+    added = []
+    tables = [(bind_key, table) for bind_key, metadata in db.metadatas.items() for table in metadata.sorted_tables]
+    for bind_key, table in tables:
+        engine = db.engines[bind_key]
+        inspector = inspect(engine)
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += " NOT NULL"
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+def migrate_json_columns(batch_size=500):
+    """Rewrites str()-encoded lists ("['Python']") in resumes as JSON ('["Python"]')."""
+    converted = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            text(f"SELECT id, {', '.join(JSON_COLUMNS)} FROM resumes WHERE id > :last_id ORDER BY id LIMIT :n"),
+            {"last_id": last_id, "n": batch_size}
+        ).mappings().all()
+        if not rows:
+            break
+
+        for row in rows:
+            updates = {}
+            for column in JSON_COLUMNS:
+                value = row[column]
+                if value is None or not isinstance(value, str):
+                    continue
+                try:
+                    json.loads(value)
+                    continue # Already JSON
+                except ValueError:
+                    updates[column] = json.dumps(ast.literal_eval(value))
+            if updates:
+                assignments = ', '.join(f"{column} = :{column}" for column in updates)
+                db.session.execute(text(f"UPDATE resumes SET {assignments} WHERE id = :id"), {**updates, "id": row["id"]})
+                converted += 1
+
+        db.session.commit()
+        last_id = rows[-1]["id"]
+        print(f"  ...checked up to resume {last_id}")
+
+    # create_all() does not add indexes to tables that already exist
+    for index in Resume.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+
+    return converted
+
+def compress_text_dumps(batch_size=200):
+    """Moves plain resume_pii.extracted_text_dump values into the compressed column, one batch per commit."""
+    engine = db.engines['pii_db']
+    compressed = 0
+    saved_bytes = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text("SELECT id, extracted_text_dump FROM resume_pii "
+                     "WHERE id > :last_id AND extracted_text_dump IS NOT NULL ORDER BY id LIMIT :n"),
+                {"last_id": last_id, "n": batch_size}
+            ).all()
+            if not rows:
+                break
+
+            params = []
+            for row_id, dump in rows:
+                packed = pack_text(dump)
+                saved_bytes += len(dump.encode('utf-8')) - len(packed)
+                params.append({"id": row_id, "packed": packed})
+            conn.execute(
+                text("UPDATE resume_pii SET extracted_text_packed = :packed, extracted_text_dump = NULL WHERE id = :id"),
+                params
+            )
+        compressed += len(rows)
+        last_id = rows[-1][0]
+        print(f"  ...compressed up to row {last_id}")
+
+    return compressed, saved_bytes
+
+def store_legacy_uploads(batch_size=200):
+    """
+    Copies files saved before content addressing (resume_pii rows without content_hash) into
+    upload storage and points the rows at the stored copy. The old files stay where they are,
+    since several rows may share one path; rows whose file is gone are counted and skipped.
+    """
+    # create_all() adds the stored_files table but no indexes to resume_pii
+    for index in ResumePII.__table__.indexes:
+        index.create(db.engines['pii_db'], checkfirst=True)
+
+    stored = missing = 0
+    last_id = 0
+    while True:
+        rows = (
+            ResumePII.query.filter(ResumePII.id > last_id, ResumePII.content_hash.is_(None))
+            .order_by(ResumePII.id).limit(batch_size).all()
+        )
+        if not rows:
+            break
+
+        refs = []
+        for pii in rows:
+            data = upload_store.read(None, pii.file_path)
+            if data is None:
+                missing += 1
+                continue
+            key, size = upload_store.save(data)
+            pii.content_hash = key
+            pii.file_path = upload_store.location(key)
+            refs.append((key, size))
+        upload_store.add_refs(refs)
+        db.session.commit()
+        stored += len(refs)
+        last_id = rows[-1].id
+        print(f"  ...stored up to row {last_id}")
+
+    return stored, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('migration', choices=['columns', 'json-columns', 'compress-text', 'store-uploads'])
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        if args.migration == 'columns':
+            print("Adding missing columns...")
+            for name in add_missing_columns():
+                print(f"  + {name}")
+        elif args.migration == 'json-columns':
+            print("Converting feedback/skills columns to JSON...")
+            print(f"Converted {migrate_json_columns(args.batch_size)} resumes.")
+        elif args.migration == 'compress-text':
+            print("Compressing stored resume text...")
+            count, saved_bytes = compress_text_dumps(args.batch_size)
+            print(f"Compressed {count} rows, {saved_bytes / 1024 / 1024:.1f} MB smaller. "
+                  "Run VACUUM on the PII database to return the space to the filesystem.")
+        elif args.migration == 'store-uploads':
+            print("Moving saved uploads into content-addressed storage...")
+            count, missing = store_legacy_uploads(args.batch_size)
+            print(f"Stored {count} uploads ({missing} files already missing). "
+                  "The old flat files in uploads/ can be removed once backed up.")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,58 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import foreign
 import datetime
+import sqlite3
+import zlib
 
 db = SQLAlchemy()
 
+_sqlite_pragmas = []
+
+def enable_sqlite_pragmas(wal=True, synchronous='NORMAL', busy_timeout_ms=5000, mmap_size=0):
+    """Sets connection pragmas on every new SQLite connection, for both binds. Later calls replace earlier ones."""
+    pragmas = [f"PRAGMA busy_timeout = {int(busy_timeout_ms)}", f"PRAGMA synchronous = {synchronous}"]
+    if wal:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL") # Persistent, but cheap to re-assert
+    if mmap_size:
+        pragmas.append(f"PRAGMA mmap_size = {int(mmap_size)}")
+    _sqlite_pragmas[:] = pragmas
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not _sqlite_pragmas or not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for pragma in _sqlite_pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+# Stored text format: one marker byte, then the payload
+TEXT_ZLIB = b'z'   # zlib-compressed UTF-8
+TEXT_PLAIN = b't'  # UTF-8 as is, for texts too short to gain from compression
+MIN_COMPRESS_BYTES = 256
+
+def pack_text(text):
+    if text is None:
+        return None
+    raw = text.encode('utf-8')
+    if len(raw) >= MIN_COMPRESS_BYTES:
+        return TEXT_ZLIB + zlib.compress(raw, 6)
+    return TEXT_PLAIN + raw
+
+def unpack_text(packed):
+    if packed is None:
+        return None
+    packed = bytes(packed)
+    marker, payload = packed[:1], packed[1:]
+    if marker == TEXT_ZLIB:
+        return zlib.decompress(payload).decode('utf-8')
+    if marker == TEXT_PLAIN:
+        return payload.decode('utf-8')
+    raise ValueError(f"Unknown stored text format {marker!r}")
+
 # ----------------------
 # DATABASE 1: MAIN (Operational)
 # ----------------------
@@ -14,6 +63,9 @@ class User(db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
 
+    # Bumped in the same transaction as any write to this user's resumes; ETags are built from it
+    resume_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
 class Resume(db.Model):
     __tablename__ = 'resumes'
     id = db.Column(db.Integer, primary_key=True)
@@ -21,17 +73,25 @@ class Resume(db.Model):
     
     # 1. Structure Check (Health)
     structure_score = db.Column(db.Float, nullable=True)
-    structure_feedback = db.Column(db.Text, nullable=True) # Stored as string "[Missing1, Missing2]"
+    structure_feedback = db.Column(db.JSON, nullable=True) # ["Missing1", "Missing2"]
 
     # 2. ATS Robot Check
     ats_score = db.Column(db.Float, nullable=True)
-    ats_feedback = db.Column(db.Text, nullable=True) # Stored as string "[Issue1, Issue2]"
+    ats_feedback = db.Column(db.JSON, nullable=True) # ["Issue1", "Issue2"]
 
     # 3. Internship Matching (Privacy Safe)
-    skills_detected = db.Column(db.Text, nullable=True) # Stored as string "['Python', 'React']"
+    skills_detected = db.Column(db.JSON, nullable=True) # ["Python", "React"]
 
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
 
+    # rules.RULES_VERSION the scores and skills above were computed with (NULL: before versioning)
+    rules_version = db.Column(db.Integer, nullable=True)
+
+    # /profile pages through a user's history newest-first on (created_at, id)
+    __table_args__ = (
+        db.Index('ix_resumes_user_created', 'user_id', 'created_at', 'id'),
+    )
+
     # Magic Link to the Secret DB
     pii = db.relationship(
         'ResumePII', 
@@ -41,6 +101,65 @@ class Resume(db.Model):
         cascade="all, delete-orphan"
     )
 
+# Internship catalog. Matching reads it through the in-memory index in catalog.py
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    company = db.Column(db.String(200), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    skills = db.relationship('JobSkill', backref='job', cascade="all, delete-orphan")
+
+class JobSkill(db.Model):
+    __tablename__ = 'job_skills'
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False, index=True)
+    skill = db.Column(db.String(100), nullable=False, index=True) # Display form, e.g. "React"
+
+# Append-only log of catalog edits. Each worker replays rows newer than the last one it
+# saw, so the in-memory index refreshes incrementally instead of reloading every posting.
+class JobChange(db.Model):
+    __tablename__ = 'job_changes'
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, nullable=False)
+    removed = db.Column(db.Boolean, default=False, nullable=False)
+
+# Single row (id 1) bumped in the transaction of every JobChange, so its value names the committed
+# catalog. Unlike JobChange ids it cannot move backwards, so it is safe to put in an ETag.
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_version'
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# Running totals behind GET /analytics, kept by analytics.py in the same transaction as the
+# resume writes they count. `flask rebuild-analytics` recomputes them from the resumes table.
+class SkillStat(db.Model):
+    __tablename__ = 'analytics_skills'
+    skill = db.Column(db.String(100), primary_key=True) # Canonical name, as in skills_detected
+    resumes = db.Column(db.Integer, nullable=False, default=0)
+
+class ScoreBucket(db.Model):
+    __tablename__ = 'analytics_score_buckets'
+    kind = db.Column(db.String(20), primary_key=True)    # structure | ats
+    bucket = db.Column(db.Integer, primary_key=True, autoincrement=False) # score // 10; 10 holds the 100s
+    resumes = db.Column(db.Integer, nullable=False, default=0)
+
+class DailyStat(db.Model):
+    __tablename__ = 'analytics_daily'
+    day = db.Column(db.Date, primary_key=True) # UTC day the resume was created
+    resumes = db.Column(db.Integer, nullable=False, default=0)
+    structure_count = db.Column(db.Integer, nullable=False, default=0)
+    structure_sum = db.Column(db.Float, nullable=False, default=0)
+    ats_count = db.Column(db.Integer, nullable=False, default=0)
+    ats_sum = db.Column(db.Float, nullable=False, default=0)
+
+class JobMatchStat(db.Model):
+    __tablename__ = 'analytics_job_matches'
+    job_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    resumes = db.Column(db.Integer, nullable=False, default=0) # Stored resumes sharing a skill with the posting
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+
 # ----------------------
 # DATABASE 2: PII (Sensitive / Encrypted Storage)
 # ----------------------
@@ -55,4 +174,39 @@ class ResumePII(db.Model):
     # 🔒 SENSITIVE FILE DATA
     original_filename = db.Column(db.String(255)) 
     file_path = db.Column(db.String(512)) 
-    extracted_text_dump = db.Column(db.Text)
\ No newline at end of file
+    # sha256 of the upload, its key in storage.upload_store (counted in stored_files).
+    # NULL for files saved before content addressing, which are read from file_path
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+
+    # The resume text, packed by pack_text(). Both columns are deferred: loading `resume.pii`
+    # for a filename no longer pulls the whole text. Rows written before compression keep the
+    # plain column until `python migrate.py compress-text` moves them over.
+    extracted_text_packed = db.deferred(db.Column(db.LargeBinary))
+    extracted_text_legacy = db.deferred(db.Column('extracted_text_dump', db.Text))
+
+    @hybrid_property
+    def extracted_text_dump(self):
+        # Decompressed on access, never at load time
+        if self.extracted_text_packed is not None:
+            return unpack_text(self.extracted_text_packed)
+        return self.extracted_text_legacy
+
+    @extracted_text_dump.inplace.setter
+    def _extracted_text_dump_setter(self, text):
+        self.extracted_text_packed = pack_text(text)
+        self.extracted_text_legacy = None
+
+    @extracted_text_dump.inplace.expression
+    @classmethod
+    def _extracted_text_dump_expression(cls):
+        # Only usable for NULL checks in queries; the content itself is compressed
+        return cls.extracted_text_packed
+
+# One row per blob in upload storage (storage.py); refs counts the resume_pii rows using it
+class StoredFile(db.Model):
+    __bind_key__ = 'pii_db'
+    __tablename__ = 'stored_files'
+
+    content_hash = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    refs = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,86 @@
+import io
+import re
+
+# Text-showing operators: Tj, TJ, ' and ". The quote forms are rare in resumes and too
+# ambiguous to spot without tokenising, so only Tj/TJ are counted.
+TEXT_SHOW_RE = re.compile(rb'(?<![A-Za-z])T[jJ](?![A-Za-z])')
+
+# Readable kinds only; anything else short-circuits extraction
+TEXT = 'text'
+SCANNED = 'scanned'      # pages draw images (or vector outlines) but never show text
+ENCRYPTED = 'encrypted'  # needs a user password we do not have
+CORRUPT = 'corrupt'      # not a PDF, or pdfminer cannot parse its structure
+
+PREFLIGHT_PAGES = 3
+_MAX_FORM_DEPTH = 2
+
+
+def open_document(data):
+    """
+    Parses the trailer/xref of a PDF without touching page content.
+    Returns (PDFDocument, None), or (None, report) when the file is encrypted or broken.
+    The document caches parsed objects and decoded streams, so extraction can reuse it.
+    """
+    from pdfminer.pdfdocument import PDFDocument, PDFEncryptionError, PDFPasswordIncorrect
+    from pdfminer.pdfparser import PDFParser
+
+    if b'%PDF' not in data[:1024]:
+        return None, _report(CORRUPT, error="No PDF header")
+    try:
+        return PDFDocument(PDFParser(io.BytesIO(data)), caching=True), None
+    except (PDFPasswordIncorrect, PDFEncryptionError) as e:
+        return None, _report(ENCRYPTED, error=type(e).__name__)
+    except Exception as e:
+        return None, _report(CORRUPT, error=f"{type(e).__name__}: {e}")
+
+def _report(kind, pages=0, fonts=0, text_ops=0, images=0, error=None):
+    return {"kind": kind, "pages_inspected": pages, "fonts": fonts, "text_ops": text_ops, "images": images, "error": error}
+
+def _scan_resources(resources, streams, counts, depth, seen):
+    """Adds the fonts, image XObjects and text operators reachable from one resource dict."""
+    from pdfminer.pdftypes import resolve1, stream_value
+    from pdfminer.psparser import LIT
+
+    resources = resolve1(resources) or {}
+    counts["fonts"] += len(resolve1(resources.get('Font')) or {})
+    for stream in streams:
+        counts["text_ops"] += len(TEXT_SHOW_RE.findall(stream_value(stream).get_data()))
+
+    for ref in (resolve1(resources.get('XObject')) or {}).values():
+        xobject = stream_value(ref)
+        subtype = xobject.get('Subtype')
+        if subtype is LIT('Image'):
+            counts["images"] += 1
+        elif subtype is LIT('Form') and depth < _MAX_FORM_DEPTH and id(xobject) not in seen:
+            # Some generators wrap the whole page in a form XObject
+            seen.add(id(xobject))
+            _scan_resources(xobject.get('Resources'), [xobject], counts, depth + 1, seen)
+
+def inspect_document(doc, max_pages=PREFLIGHT_PAGES):
+    """
+    Classifies a document from the object structure of its first pages: font resources,
+    text-show operators in the content streams and image XObjects. No layout analysis,
+    so it costs milliseconds where extraction costs the full pdfminer pass.
+    """
+    from pdfminer.pdfpage import PDFPage
+
+    counts = {"fonts": 0, "text_ops": 0, "images": 0}
+    pages = 0
+    try:
+        for page in PDFPage.create_pages(doc):
+            _scan_resources(page.resources, page.contents, counts, 0, set())
+            pages += 1
+            if counts["text_ops"] or pages >= max_pages:
+                break
+    except Exception as e:
+        if not pages and not counts["text_ops"]:
+            return _report(CORRUPT, pages, error=f"{type(e).__name__}: {e}", **counts)
+
+    if not pages:
+        return _report(CORRUPT, error="No pages")
+    return _report(TEXT if counts["text_ops"] else SCANNED, pages, **counts)
+
+def inspect_pdf(data, max_pages=PREFLIGHT_PAGES):
+    """Pre-flight report for raw PDF bytes: {"kind", "pages_inspected", "fonts", "text_ops", "images", "error"}."""
+    doc, report = open_document(data)
+    return report or inspect_document(doc, max_pages)
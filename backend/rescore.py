@@ -0,0 +1,133 @@
+"""
+Re-scores stored resumes whose rules_version is behind rules.RULES_VERSION, using the
+text saved in the PII database (pdfminer never runs). Run after bumping RULES_VERSION:
+
+    python rescore.py [--batch-size 500] [--workers 4]
+
+Stale rows are read in id order, one batch at a time, scored in a process pool and
+written back with one bulk UPDATE and one commit per batch. Each committed row is
+stamped with the current version, so an interrupted run simply continues where it
+stopped the next time.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import or_, update
+
+from analytics import AnalyticsDelta, resume_snapshot, snapshot
+from app import create_app, db
+from models import User, Resume, ResumePII
+from rules import RULES_VERSION, ATS_TRUNCATED_ISSUE, ATS_UNREADABLE_ISSUES
+from storage import upload_store
+from tasks import run_rescore
+
+
+def stale_resumes(after_id, batch_size):
+    return (
+        db.session.query(
+            Resume.id, Resume.user_id, Resume.structure_score, Resume.ats_score, Resume.ats_feedback,
+            Resume.skills_detected, Resume.created_at
+        )
+        .filter(or_(Resume.rules_version.is_(None), Resume.rules_version < RULES_VERSION))
+        .filter(Resume.id > after_id)
+        .order_by(Resume.id)
+        .limit(batch_size)
+        .all()
+    )
+
+def load_texts(resume_ids):
+    """resume_id -> (packed text, legacy text, content hash, file path), in one query on the PII bind."""
+    rows = db.session.query(
+        ResumePII.resume_id, ResumePII.extracted_text_packed, ResumePII.extracted_text_legacy,
+        ResumePII.content_hash, ResumePII.file_path
+    ).filter(ResumePII.resume_id.in_(resume_ids)).all()
+    return {r.resume_id: (r.extracted_text_packed, r.extracted_text_legacy, r.content_hash, r.file_path) for r in rows}
+
+def unreadable_kind(ats_feedback):
+    """The pre-flight kind (scanned/encrypted/corrupt) the last ATS run reported, or None."""
+    for kind, issue in ATS_UNREADABLE_ISSUES.items():
+        if issue in (ats_feedback or []):
+            return kind
+    return None
+
+def build_items(rows, texts):
+    items = []
+    for row in rows:
+        packed, legacy, content_hash, file_path = texts.get(row.id, (None, None, None, None))
+        if packed is None and legacy is None:
+            continue # Nothing stored to score from; left stale
+        items.append({
+            "id": row.id,
+            "packed": packed,
+            "legacy": legacy,
+            # Only feeds the "looks like a scan" check; 0 when the upload is gone
+            "file_size": upload_store.size(content_hash, file_path),
+            # The text was cut at extraction time if the last ATS run said so
+            "truncated": ATS_TRUNCATED_ISSUE in (row.ats_feedback or []),
+            # Likewise an encrypted or broken file: its (empty) text alone would not say so
+            "unreadable": unreadable_kind(row.ats_feedback),
+            "structure": row.structure_score is not None,
+            "ats": row.ats_score is not None
+        })
+    return items
+
+def rescore_stale(batch_size=500, workers=None):
+    """Returns (rescored, skipped) row counts."""
+    rescored = skipped = 0
+    last_id = 0
+    started = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, batch_size // ((workers or os.cpu_count() or 1) * 4))
+        while True:
+            rows = stale_resumes(last_id, batch_size)
+            if not rows:
+                break
+
+            items = build_items(rows, load_texts([r.id for r in rows]))
+            updates = list(pool.map(run_rescore, items, chunksize=chunksize))
+            if updates:
+                db.session.execute(update(Resume), updates)
+                # Cached /profile and /internship-match bodies of these users are now outdated
+                user_ids = {r.user_id for r in rows if r.user_id is not None}
+                User.query.filter(User.id.in_(user_ids)).update(
+                    {User.resume_version: User.resume_version + 1}, synchronize_session=False
+                )
+                # Move the dashboard totals from the old scores/skills to the new ones
+                delta = AnalyticsDelta()
+                by_id = {r.id: r for r in rows}
+                for new in updates:
+                    old = by_id[new["id"]]
+                    delta.add(resume_snapshot(old), snapshot(
+                        new["skills_detected"],
+                        new.get("structure_score", old.structure_score),
+                        new.get("ats_score", old.ats_score),
+                        old.created_at
+                    ))
+                delta.apply()
+            db.session.commit()
+
+            rescored += len(updates)
+            skipped += len(rows) - len(updates)
+            last_id = rows[-1].id
+            rate = rescored / max(time.time() - started, 1e-6)
+            print(f"  ...up to resume {last_id}: {rescored} rescored, {skipped} skipped ({rate:.0f}/s)")
+
+    return rescored, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+    args = parser.parse_args()
+
+    with create_app().app_context():
+        print(f"Re-scoring resumes below rules version {RULES_VERSION}...")
+        rescored, skipped = rescore_stale(args.batch_size, args.workers)
+        print(f"Rescored {rescored} resumes; {skipped} had no stored text.")
+
+
+if __name__ == '__main__':
+    main()
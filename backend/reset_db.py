@@ -1,8 +1,10 @@
-from app import app, db
+"""
+Drops and recreates every table, then seeds the catalog. Same as `flask --app wsgi reset-db`.
+For a new database without dropping anything, use `flask --app wsgi init-db`.
+"""
+from app import create_app, init_database
 
-with app.app_context():
-    print("Dropping all tables...")
-    db.drop_all()
-    print("Creating all tables...")
-    db.create_all()
+with create_app().app_context():
+    print("Dropping and recreating all tables...")
+    print(f"Seeded {init_database(drop=True)} internship postings.")
     print("Database reset complete!")
@@ -0,0 +1,93 @@
+import json
+import os
+import re
+
+DEFAULT_TAXONOMY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills.json')
+
+# Words with their inner dots/pluses/hashes kept ("node.js", "c++", "c#", ".net");
+# anything else, including a sentence-ending period, separates tokens.
+TOKEN_PATTERN = re.compile(r'\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*')
+
+_END = None # Trie key marking "a skill ends here"
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillTaxonomy:
+    """
+    Canonical skills and their aliases, compiled into a trie over tokens.
+    extract() walks the resume's tokens once; at each token it follows the trie for the
+    longest phrase starting there, so matches fall on word boundaries ("java" never
+    matches inside "javascript") and the cost grows with the text, not the taxonomy.
+    """
+
+    def __init__(self, entries=()):
+        self.names = []      # canonical names, in taxonomy order
+        self.aliases = {}    # lowercased surface form -> index into names
+        self.trie = {}
+        for entry in entries:
+            self.add(entry["name"], entry.get("aliases", ()), entry.get("match_name", True))
+
+    @classmethod
+    def load(cls, path=DEFAULT_TAXONOMY):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def add(self, name, aliases=(), match_name=True):
+        """match_name=False for names that are ordinary words ("Go", "C"); only the aliases match."""
+        index = len(self.names)
+        self.names.append(name)
+        self.aliases[name.lower()] = index
+        surfaces = list(aliases) + ([name] if match_name else [])
+        for surface in surfaces:
+            self.aliases.setdefault(surface.lower(), index)
+            tokens = tokenize(surface)
+            if not tokens:
+                continue
+            node = self.trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(_END, index)
+
+    def canonical(self, skill):
+        """Canonical name for a skill or alias; unknown skills come back unchanged."""
+        index = self.aliases.get(skill.lower())
+        return skill if index is None else self.names[index]
+
+    def key(self, skill):
+        """Matching key: lowercased canonical name, so "ReactJS" on a posting meets "React" on a resume."""
+        return self.canonical(skill).lower()
+
+    def extract(self, text):
+        """Canonical names of all skills mentioned in text, in taxonomy order."""
+        tokens = tokenize(text)
+        trie = self.trie
+        found = set()
+        i = 0
+        n = len(tokens)
+        while i < n:
+            node = trie.get(tokens[i])
+            if node is None:
+                i += 1
+                continue
+            # Longest phrase starting at token i wins ("react native" over "react")
+            match, length = node.get(_END), 1
+            j = i + 1
+            while j < n:
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    match, length = node[_END], j - i
+            if match is None:
+                i += 1
+            else:
+                found.add(match)
+                i += length
+        return [self.names[index] for index in sorted(found)]
+
+
+skill_taxonomy = SkillTaxonomy.load()
@@ -0,0 +1,255 @@
+import collections
+import hashlib
+import importlib
+import io
+import os
+import tempfile
+import time
+
+from sqlalchemy.exc import IntegrityError
+
+from models import db, StoredFile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StorageBackend:
+    """
+    Where uploaded files live. Blobs are immutable and named by the sha256 of their bytes,
+    so a key always means the same content and identical uploads share one blob.
+    Subclasses implement the methods below; reference counting is UploadStore's job.
+    """
+
+    @classmethod
+    def from_config(cls, config):
+        raise NotImplementedError
+
+    def save(self, stream):
+        """Stores everything read from a binary file object, hashing as it goes. Returns (key, size)."""
+        raise NotImplementedError
+
+    def open(self, key):
+        """Readable binary file object; raises FileNotFoundError for unknown keys."""
+        raise NotImplementedError
+
+    def size(self, key):
+        raise NotImplementedError
+
+    def delete(self, key, older_than=0):
+        """Removes the blob unless it was saved (or deduplicated) in the last older_than seconds. True if removed."""
+        raise NotImplementedError
+
+    def keys(self):
+        raise NotImplementedError
+
+    def location(self, key):
+        """What ResumePII.file_path records for this blob."""
+        raise NotImplementedError
+
+
+class LocalStorage(StorageBackend):
+    """
+    Blobs at <root>/ab/cd/<sha256>.pdf: two levels of 256 shards keep every directory small.
+    Uploads are streamed to a temp file in <root> while hashed, then renamed into place, so a
+    reader never sees half a file and concurrent uploads of the same bytes both succeed.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config['UPLOAD_FOLDER'])
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], key + '.pdf')
+
+    def save(self, stream):
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # Same filesystem as the shards, so the rename below is atomic
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+
+            key = digest.hexdigest()
+            path = self._path(key)
+            try:
+                # Already stored: keep one copy, and freshen its mtime so a delete racing
+                # with this upload leaves it alone (see UploadStore.purge)
+                os.utime(path)
+            except FileNotFoundError:
+                # Not stored, or purged since; either way this upload puts it (back) in place.
+                # The shard may have just been removed with it, hence makedirs here
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                tmp_path = None
+        finally:
+            if tmp_path:
+                os.unlink(tmp_path)
+        return key, size
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def size(self, key):
+        return os.path.getsize(self._path(key))
+
+    def delete(self, key, older_than=0):
+        path = self._path(key)
+        try:
+            if older_than and time.time() - os.path.getmtime(path) < older_than:
+                return False
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        for directory in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+            try:
+                os.rmdir(directory) # Only succeeds once the shard is empty
+            except OSError:
+                break
+        return True
+
+    def keys(self):
+        if not os.path.isdir(self.root):
+            return
+        for first in sorted(os.listdir(self.root)):
+            outer = os.path.join(self.root, first)
+            if len(first) != 2 or not os.path.isdir(outer):
+                continue # Legacy flat uploads and temp files live next to the shards
+            for second in sorted(os.listdir(outer)):
+                inner = os.path.join(outer, second)
+                if not os.path.isdir(inner):
+                    continue
+                for name in sorted(os.listdir(inner)):
+                    if name.endswith('.pdf'):
+                        yield name[:-4]
+
+    def location(self, key):
+        return self._path(key)
+
+
+BACKENDS = {'local': LocalStorage}
+
+def load_backend(name, config):
+    """name: a key of BACKENDS, or "package.module:Class" for a StorageBackend subclass elsewhere."""
+    if name in BACKENDS:
+        cls = BACKENDS[name]
+    else:
+        module_name, _, class_name = name.partition(':')
+        cls = getattr(importlib.import_module(module_name), class_name)
+    return cls.from_config(config)
+
+
+class UploadStore:
+    """
+    Content-addressed upload storage with reference counts in stored_files (PII bind).
+    add_ref/release run in the caller's transaction next to the ResumePII rows they count;
+    blobs are only removed after that transaction commits (purge).
+    Rows from before content addressing have no content_hash and are read from file_path.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.delete_grace = 600
+
+    def configure(self, backend, delete_grace=None):
+        self.backend = backend
+        if delete_grace is not None:
+            self.delete_grace = delete_grace
+
+    def save(self, source):
+        """Stores bytes or a binary stream. Returns (key, size); nothing references it until add_ref."""
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return self.backend.save(source)
+
+    def location(self, key):
+        return self.backend.location(key)
+
+    def add_ref(self, key, size, count=1):
+        updated = StoredFile.query.filter_by(content_hash=key).update(
+            {StoredFile.refs: StoredFile.refs + count}, synchronize_session=False
+        )
+        if updated:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.add(StoredFile(content_hash=key, size=size, refs=count))
+        except IntegrityError:
+            # Another upload of the same bytes created the row first
+            StoredFile.query.filter_by(content_hash=key).update(
+                {StoredFile.refs: StoredFile.refs + count}, synchronize_session=False
+            )
+
+    def add_refs(self, stored):
+        """stored: [(key, size)], duplicates allowed; one statement per distinct key."""
+        counts = collections.Counter(key for key, _ in stored)
+        sizes = dict(stored)
+        for key in sorted(counts):
+            self.add_ref(key, sizes[key], counts[key])
+
+    def release(self, key):
+        """Drops one reference. Returns True when it was the last, i.e. purge(key) after commit."""
+        StoredFile.query.filter_by(content_hash=key).update(
+            {StoredFile.refs: StoredFile.refs - 1}, synchronize_session=False
+        )
+        row = db.session.get(StoredFile, key, populate_existing=True)
+        if row is None or row.refs > 0:
+            return False
+        db.session.delete(row)
+        return True
+
+    def purge(self, key):
+        """
+        Deletes an unreferenced blob. Kept when it was saved within delete_grace seconds: an
+        upload of the same bytes may have reused it and not committed its reference yet.
+        `flask sweep-uploads` collects those later.
+        """
+        if db.session.get(StoredFile, key) is not None:
+            return False
+        return self.backend.delete(key, older_than=self.delete_grace)
+
+    def sweep(self):
+        """Deletes every blob with no stored_files row that is older than delete_grace. Returns the count."""
+        removed = 0
+        for key in self.backend.keys():
+            if db.session.get(StoredFile, key) is None and self.backend.delete(key, older_than=self.delete_grace):
+                removed += 1
+        return removed
+
+    def read(self, content_hash, file_path):
+        """The stored bytes of one resume, or None when they are gone."""
+        try:
+            if content_hash:
+                with self.backend.open(content_hash) as f:
+                    return f.read()
+            if file_path:
+                with open(file_path, 'rb') as f:
+                    return f.read()
+        except OSError:
+            pass
+        return None
+
+    def size(self, content_hash, file_path):
+        try:
+            if content_hash:
+                return self.backend.size(content_hash)
+            if file_path:
+                return os.path.getsize(file_path)
+        except OSError:
+            pass
+        return 0
+
+
+upload_store = UploadStore()
@@ -0,0 +1,303 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import utils
+from models import unpack_text
+from preflight import CORRUPT
+from rules import RULES_VERSION, scan
+from utils import extract_pdf, analyze_resume_structure, analyze_ats_compatibility, extract_skills
+
+JOB_ID_RE = re.compile(r'[0-9a-f]{32}')
+
+
+# --- WORKER SIDE (runs inside the process pool) ---
+
+def init_worker(cache_options, limits):
+    # Children share the disk tier of the extraction cache and the limits of the web workers
+    utils.extraction_cache.configure(**cache_options)
+    utils.set_extraction_limits(**limits)
+
+def run_analysis(kind, source, file_size, persist=True):
+    """
+    The CPU-bound part of /analyze and /ats-scan: extraction, scoring and skills.
+    Pure function of the file (path or bytes), so it can run in the request thread or in the pool.
+    persist=False (anonymous uploads) keeps the extracted text out of the disk cache.
+    """
+    extracted = extract_pdf(source, persist)
+    resume_text = extracted["text"]
+    result = {
+        "text": resume_text,
+        "skills": extract_skills(resume_text)
+    }
+
+    if kind == 'analyze':
+        result["score"], result["feedback"] = analyze_resume_structure(resume_text)
+    else:
+        result["score"], result["results"] = analyze_ats_compatibility(resume_text, file_size, extracted["truncated"], extracted.get("preflight"))
+
+    return result
+
+def run_full_analysis(source, file_size):
+    """Everything a bulk upload stores for one file: both scores, skills and the text."""
+    extracted = extract_pdf(source)
+    resume_text = extracted["text"]
+    hits = scan(resume_text)
+    structure_score, structure_feedback = analyze_resume_structure(resume_text, hits)
+    ats_score, ats_results = analyze_ats_compatibility(resume_text, file_size, extracted["truncated"], extracted.get("preflight"), hits)
+    return {
+        "text": resume_text,
+        "skills": extract_skills(resume_text),
+        "structure_score": structure_score,
+        "structure_feedback": structure_feedback,
+        "ats_score": ats_score,
+        "ats_results": ats_results,
+        "preflight": extracted.get("preflight")
+    }
+
+def run_ingest(path):
+    """
+    Offline ingestion (ingest.py): full analysis of one PDF on disk. Failures come back as
+    {"error"} instead of raising, so one bad file does not stop an ordered pool.map.
+    """
+    try:
+        result = run_full_analysis(path, os.path.getsize(path))
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    # Unlike an upload, a file that is not a PDF at all is left out rather than stored with a 0
+    preflight = result["preflight"] or {}
+    if preflight.get("kind") == CORRUPT:
+        return {"error": f"Not a readable PDF ({preflight['error']})"}
+    return result
+
+def run_rescore(item):
+    """
+    Re-scores one stored resume from its saved text, no PDF parsing. Only the scores the row
+    already has are recomputed. Returns the column values for a bulk UPDATE of that row.
+    item: {"id", "packed", "legacy", "file_size", "truncated", "unreadable", "structure", "ats"}
+    """
+    resume_text = unpack_text(item["packed"]) if item["packed"] is not None else item["legacy"]
+    update = {
+        "id": item["id"],
+        "skills_detected": extract_skills(resume_text),
+        "rules_version": RULES_VERSION
+    }
+    hits = scan(resume_text)
+    if item["structure"]:
+        score, feedback = analyze_resume_structure(resume_text, hits)
+        update["structure_score"] = score
+        update["structure_feedback"] = feedback["missing"]
+    if item["ats"]:
+        # Stands in for the pre-flight report, so an unreadable file stays at 0
+        preflight = {"kind": item["unreadable"]} if item["unreadable"] else None
+        score, results = analyze_ats_compatibility(resume_text, item["file_size"], item["truncated"], preflight, hits)
+        update["ats_score"] = score
+        update["ats_feedback"] = results["issues"]
+    return update
+
+
+# --- WEB SIDE (job bookkeeping) ---
+
+class AnalysisJobs:
+    """
+    Bounded process pool for async /analyze and /ats-scan. Job records are JSON files in
+    jobs_dir, so a poll reaching any web worker finds the job. Only logged-in users get jobs:
+    a record holds the parsed contact details, which anonymous scans never write to disk.
+    Expired records are swept by a background thread. Results are saved (on_done)
+    on a small thread pool, never on the process pool's result thread, so one slow commit
+    does not hold up the results of other jobs or of bulk uploads sharing the pool.
+    """
+
+    # Seconds between sweeps of expired job files
+    PRUNE_INTERVAL = 60
+
+    def __init__(self):
+        self.max_workers = 2
+        self.max_pending = 16
+        self.result_ttl = 600
+        self.finish_workers = 2
+        self.jobs_dir = None
+        self._initargs = ({}, {})
+        self._executor = None
+        self._finisher = None
+        self._sweeper = None
+        self._futures = {} # job id -> future, for jobs this process is running
+        self._pending = 0
+        self._last_prune = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers=None, max_pending=None, result_ttl=None, jobs_dir=None):
+        if max_workers:
+            self.max_workers = max_workers
+        if max_pending:
+            self.max_pending = max_pending
+        if result_ttl:
+            self.result_ttl = result_ttl
+        if jobs_dir:
+            os.makedirs(jobs_dir, exist_ok=True)
+            self.jobs_dir = jobs_dir
+            self._prune(time.time()) # Leftovers from before a restart
+        # Snapshot of the extraction cache and limits, so configure this after both
+        self._initargs = (utils.extraction_cache.options(), dict(utils.extraction_limits))
+
+    def get_executor(self):
+        # Created on first use so sync-only deployments never fork a pool
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_worker,
+                initargs=self._initargs
+            )
+        return self._executor
+
+    def _get_finisher(self):
+        with self._lock:
+            if self._finisher is None:
+                self._finisher = ThreadPoolExecutor(max_workers=self.finish_workers, thread_name_prefix='analysis-finish')
+            return self._finisher
+
+    def _path(self, job_id):
+        return os.path.join(self.jobs_dir, job_id + '.json')
+
+    def _write(self, job):
+        # Temp file + rename, so a poll never reads half a record
+        fd, tmp_path = tempfile.mkstemp(dir=self.jobs_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(job, f)
+        os.replace(tmp_path, self._path(job["id"]))
+
+    def _start_sweeper(self):
+        # One per process, started on first use: threads do not survive gunicorn's fork
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            self._sweeper = threading.Thread(target=self._sweep, name='analysis-jobs-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def _sweep(self):
+        while True:
+            time.sleep(self.PRUNE_INTERVAL)
+            try:
+                self._prune(time.time())
+            except OSError:
+                pass
+
+    def _prune(self, now):
+        # Records are rewritten when a job finishes, so the mtime is its last change
+        with self._lock:
+            if now - self._last_prune < self.PRUNE_INTERVAL:
+                return
+            self._last_prune = now
+        for entry in os.scandir(self.jobs_dir):
+            try:
+                if now - entry.stat().st_mtime > self.result_ttl:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    def submit(self, owner_id, on_done, *args):
+        """
+        Queues run_analysis(*args) for owner_id (required). on_done(result) runs in this
+        process once the worker returns, and its return value becomes the job result.
+        Returns the job id, or None when the queue is full.
+        """
+        if not owner_id:
+            raise ValueError("Async jobs need an owner; anonymous scans run synchronously")
+        self._start_sweeper()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                return None
+            self._pending += 1
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "owner": owner_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "finished_at": None
+        }
+        try:
+            self._write(job)
+            future = self.get_executor().submit(run_analysis, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            self.discard(job["id"])
+            raise
+
+        self._futures[job["id"]] = future
+        future.add_done_callback(lambda f: self._get_finisher().submit(self._finish, job, f, on_done))
+        return job["id"]
+
+    def reserve(self, wanted):
+        """
+        Claims up to `wanted` queue slots for work submitted straight to the executor
+        (bulk uploads), so it counts against max_pending. Returns how many were granted;
+        hand them back with release().
+        """
+        with self._lock:
+            granted = max(0, min(wanted, self.max_pending - self._pending))
+            self._pending += granted
+            return granted
+
+    def release(self, count):
+        with self._lock:
+            self._pending -= count
+
+    def _finish(self, job, future, on_done):
+        try:
+            job["result"] = on_done(future.result())
+            job["status"] = "done"
+        except Exception as e:
+            job["error"] = str(e)
+            job["status"] = "failed"
+        finally:
+            job["finished_at"] = time.time()
+            try:
+                self._write(job)
+            finally:
+                self._futures.pop(job["id"], None)
+                with self._lock:
+                    self._pending -= 1
+
+    def get(self, job_id):
+        if not JOB_ID_RE.fullmatch(job_id):
+            return None
+        self._start_sweeper()
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Only the process running the job can tell queued from running
+        future = self._futures.get(job_id)
+        if job["status"] == "queued" and future is not None and future.running():
+            job["status"] = "running"
+        return job
+
+    def discard(self, job_id):
+        try:
+            os.unlink(self._path(job_id))
+        except OSError:
+            pass
+
+    def stats(self):
+        return {"pending": self._pending, "tracked": len(self._futures), "max_pending": self.max_pending}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._finisher is not None:
+            self._finisher.shutdown(wait=False)
+            self._finisher = None
+
+
+analysis_jobs = AnalysisJobs()
@@ -0,0 +1,173 @@
+"""
+The /analytics aggregates are kept incrementally by every resume write (analytics.py).
+After a mix of uploads, rescans, deletes and bulk uploads they must equal what
+`flask rebuild-analytics` recomputes from the resumes table.
+
+    cd backend && python -m pytest tests
+"""
+import io
+import json
+import os
+import random
+import sys
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import func
+
+import analytics
+from app import create_app, init_database
+from config import Config
+from models import db, Resume, ResumePII, StoredFile
+from tasks import analysis_jobs
+
+
+# --- ONE-PAGE TEST PDFS ---
+
+def make_pdf(lines=(), scanned=False, seed=0):
+    """A one-page PDF: Helvetica text lines, or (scanned=True) a full-page noise image and no text."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "<< /Type /Pages /Kids [3 0 R] /Count 1 >>", None]
+    resources = "/Font << /F1 5 0 R >>"
+    if scanned:
+        pixels = zlib.compress(random.Random(seed).randbytes(200 * 280 * 3))
+        ops = b"q 595 0 0 842 0 0 cm /Im0 Do Q"
+        resources += " /XObject << /Im0 6 0 R >>"
+    else:
+        escaped = (line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines)
+        ops = ("BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({line}) Tj T*" for line in escaped) + " ET").encode('latin-1')
+    objects[2] = f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << {resources} >> >>"
+    objects.append(f"<< /Length {len(ops)} >>\nstream\n".encode() + ops + b"\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    if scanned:
+        objects.append(
+            f"<< /Type /XObject /Subtype /Image /Width 200 /Height 280 /ColorSpace /DeviceRGB "
+            f"/BitsPerComponent 8 /Filter /FlateDecode /Length {len(pixels)} >>\nstream\n".encode() + pixels + b"\nendstream"
+        )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + (body.encode('latin-1') if isinstance(body, str) else body) + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+RESUMES = [
+    make_pdf(["Ahmad Bin Ali", "ahmad@example.com | 012-3456789", "EDUCATION", "Universiti Malaya",
+              "EXPERIENCE", "Intern at TechCorp", "SKILLS", "Python, SQL, Flask"]),
+    make_pdf(["Siti Aminah", "Kuala Lumpur, Malaysia", "PROFESSIONAL SUMMARY", "Frontend developer",
+              "SKILLS", "React, JavaScript, HTML, CSS", "Leadership and teamwork", "REFERENCES"]),
+    make_pdf(["Tan Wei Ming", "wei@example.com", "SKILLS", "Excel, Communication, AWS, Docker",
+              "AWARDS", "Dean's list"]),
+]
+SCANNED = make_pdf(scanned=True)
+
+
+# --- FIXTURES ---
+
+@pytest.fixture
+def app(tmp_path):
+    """A fresh app on throwaway SQLite binds and storage under tmp_path."""
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + str(tmp_path / 'main.db')
+        SQLALCHEMY_BINDS = {'pii_db': {'url': 'sqlite:///' + str(tmp_path / 'pii.db')}}
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        EXTRACT_CACHE_DIR = str(tmp_path / 'extract_cache')
+        ANALYSIS_JOBS_DIR = str(tmp_path / 'jobs')
+        UPLOAD_FOLDER = str(tmp_path / 'uploads')
+        UPLOAD_RATE_PER_MIN = 0
+        BCRYPT_LOG_ROUNDS = 4
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        init_database()
+    yield app
+    # The pool's children were started with this app's cache directory
+    analysis_jobs.shutdown()
+
+@pytest.fixture
+def headers(app):
+    client = app.test_client()
+    client.post('/register', json={"username": "tester", "email": "tester@example.com", "password": "secret"})
+    token = client.post('/login', json={"username": "tester", "password": "secret"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def history(app, headers):
+    """
+    Uploads, an ATS scan, a duplicate upload, a bulk upload, a rescan of a stale row and two
+    deletes. Returns the ids of the resumes left.
+    """
+    client = app.test_client()
+    for i, data in enumerate(RESUMES):
+        upload(client, headers, '/analyze', data, f'cv{i}.pdf')
+    upload(client, headers, '/ats-scan', SCANNED, 'scan.pdf')
+    upload(client, headers, '/analyze', RESUMES[0], 'again.pdf') # Same bytes, shared blob
+
+    summary = bulk_upload(client, headers, [('b0.pdf', RESUMES[1]), ('b1.pdf', RESUMES[2]), ('b2.pdf', SCANNED)])
+    assert summary["saved"] == 3 and summary["failed"] == 0
+
+    with app.app_context():
+        ids = [r.id for r in Resume.query.order_by(Resume.id)]
+        assert len(ids) == 8
+        make_stale(ids[1])
+
+    response = client.post(f'/ats-rescan/{ids[1]}', headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    for resume_id in (ids[0], ids[-1]):
+        response = client.delete(f'/resumes/{resume_id}', headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return ids[1:-1]
+
+
+def upload(client, headers, path, data, name):
+    response = client.post(path, headers=headers, data={"resume": (io.BytesIO(data), name)},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_json()
+
+def bulk_upload(client, headers, files):
+    response = client.post('/bulk-analyze', headers=headers,
+                           data={"resumes": [(io.BytesIO(data), name) for name, data in files]},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200, response.get_data(as_text=True)
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    response.close()
+    return lines[-1]
+
+def make_stale(resume_id):
+    """Rewrites a row as an older rules version would have scored it, through the normal delta path."""
+    resume = db.session.get(Resume, resume_id)
+    before = analytics.resume_snapshot(resume)
+    resume.structure_score = 5
+    resume.skills_detected = ["Cobol"]
+    resume.rules_version = 0
+    analytics.record_resume(before, analytics.resume_snapshot(resume))
+    db.session.commit()
+
+
+# --- TESTS ---
+
+def test_incremental_totals_match_rebuild(app, history):
+    with app.app_context():
+        incremental = analytics.summary()
+        assert incremental["resumes"] == len(history)
+        assert incremental["skills"] and incremental["jobs"]
+        analytics.rebuild()
+        assert analytics.summary() == incremental
+
+def test_upload_refs_match_rows(app, history):
+    with app.app_context():
+        refs = {row.content_hash: row.refs for row in StoredFile.query}
+        rows = dict(
+            db.session.query(ResumePII.content_hash, func.count())
+            .filter(ResumePII.content_hash.isnot(None))
+            .group_by(ResumePII.content_hash).all()
+        )
+        assert len(rows) == 4 # Three distinct texts and the scan; deletes left shared blobs in place
+        assert refs == rows
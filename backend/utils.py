@@ -1,219 +1,254 @@
+import functools
+import importlib.metadata
+import io
 import os
-import re
-from pdfminer.high_level import extract_text
+import time
+
+from cache import ExtractionCache
+from catalog import job_index
+from metrics import stage, timed
+from preflight import TEXT, open_document, inspect_document
+from rules import STRUCTURE_RULES, ATS_FIELD_RULES, ATS_FORMAT_RULES, ATS_TRUNCATED_ISSUE, ATS_UNREADABLE_ISSUES, scan
+from skills import skill_taxonomy
+
+@functools.lru_cache(maxsize=None)
+def extractor_version():
+    # Bump the suffix whenever extraction output changes so cached text is not reused.
+    # Read from package metadata, so a cache hit never needs pdfminer imported.
+    return f"pdfminer.six-{importlib.metadata.version('pdfminer.six')}/3"
+
+# Shared by every request in this process; app.py points the disk tier at the instance folder
+extraction_cache = ExtractionCache()
+
+# Work limits per document; app.py overrides them from Config. 0 means unlimited.
+extraction_limits = {
+    "max_pages": 10,
+    "max_chars": 100000,
+    "time_budget": 10.0, # seconds, checked between pages
+    "layout": "default"  # default | fast | off
+}
+
+# LAParams keyword arguments per mode
+LAYOUT_MODES = {
+    "default": {},
+    # Skips the costly box-ordering pass and figure text; reading order can differ on multi-column CVs
+    "fast": {"boxes_flow": None, "all_texts": False, "detect_vertical": False},
+    # No layout analysis at all: raw content-stream order
+    "off": None,
+}
+
+def load_pdfminer():
+    """
+    Imports the pdfminer modules extraction needs. Done on the first extraction rather than at
+    app import; gunicorn.conf.py calls it in the master so preloaded workers share the code.
+    """
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+    from pdfminer.pdfpage import PDFPage
+    return TextConverter, LAParams, PDFPageInterpreter, PDFResourceManager, PDFPage
+
+def set_extraction_limits(**limits):
+    for name, value in limits.items():
+        if value is not None:
+            extraction_limits[name] = value
+
+def read_pdf_bytes(source):
+    """Accepts a file path, the raw bytes, or a binary file object (e.g. an upload stream)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, 'read'):
+        return source.read()
+    with open(source, 'rb') as f:
+        return f.read()
+
+def _run_pdfminer(doc, max_pages, max_chars, time_budget, layout):
+    """
+    Page-by-page pdfminer pass (what high_level.extract_text does) that stops early once
+    a page, character or wall-clock limit is hit. The clock is checked between pages.
+    doc is the PDFDocument opened by the pre-flight, so objects it already parsed are reused.
+    truncated_by names the limit that stopped it: "pages", "chars", "time" or None.
+    """
+    TextConverter, LAParams, PDFPageInterpreter, PDFResourceManager, PDFPage = load_pdfminer()
+    started = time.monotonic()
+    output = io.StringIO()
+    rsrcmgr = PDFResourceManager(caching=True)
+    layout_options = LAYOUT_MODES[layout]
+    laparams = None if layout_options is None else LAParams(**layout_options)
+    device = TextConverter(rsrcmgr, output, codec='utf-8', laparams=laparams)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    truncated_by = None
+    pages = 0
+    try:
+        for page in PDFPage.create_pages(doc):
+            # The page limit is checked first: when both apply, the cut does not depend on timing
+            if max_pages and pages >= max_pages:
+                truncated_by = "pages"
+                break
+            if time_budget and time.monotonic() - started > time_budget:
+                truncated_by = "time"
+                break
+            interpreter.process_page(page)
+            pages += 1
+            if max_chars and output.tell() > max_chars:
+                truncated_by = "chars"
+                break
+    finally:
+        device.close()
+
+    text = output.getvalue()
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars]
+        truncated_by = truncated_by or "chars"
+    return {"text": text, "truncated": truncated_by is not None, "truncated_by": truncated_by, "pages": pages}
+
+@timed('extract')
+def extract_pdf(source, persist=True):
+    """
+    Extracts text within extraction_limits.
+    Returns {"text", "truncated", "pages", "preflight"}; truncated means a limit cut the document short.
+    A pre-flight (see preflight.py) runs first: scanned, encrypted and corrupt files skip
+    pdfminer's layout pass and come back with empty text.
+    persist=False caches the result in memory only; anonymous uploads pass it so their text
+    never reaches the disk tier.
+    """
+    try:
+        data = read_pdf_bytes(source)
+    except OSError as e:
+        print(f"Error reading PDF: {e}")
+        return {"text": "", "truncated": False, "pages": 0}
+
+    # Same bytes + same extractor + same limits = same text, so repeat uploads skip pdfminer
+    limits = extraction_limits
+    version = f"{extractor_version()}:{limits['max_pages']}:{limits['max_chars']}:{limits['layout']}"
+    key = ExtractionCache.key_for(data, version)
+    cached = extraction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with stage('preflight'):
+        doc, preflight = open_document(data)
+        preflight = preflight or inspect_document(doc)
+    if preflight["kind"] != TEXT:
+        result = {"text": "", "truncated": False, "pages": 0, "preflight": preflight}
+        extraction_cache.set(key, result, persist)
+        return result
 
-def extract_text_from_pdf(file_path):
     try:
-        text = extract_text(file_path)
-        return text
+        result = _run_pdfminer(doc, limits['max_pages'], limits['max_chars'], limits['time_budget'], limits['layout'])
     except Exception as e:
         print(f"Error reading PDF: {e}")
-        return ""
+        return {"text": "", "truncated": False, "pages": 0, "preflight": preflight}
+    result["preflight"] = preflight
 
-def analyze_resume_structure(text):
+    # A time-budget cut depends on machine load; page and character cuts are deterministic
+    if result["truncated_by"] != "time":
+        extraction_cache.set(key, result, persist)
+    return result
+
+def extract_text_from_pdf(source):
+    return extract_pdf(source)["text"]
+
+@timed('structure')
+def analyze_resume_structure(text, hits=None):
     """
     Scans the resume for essential sections and contact info.
     Returns: Score, Breakdown of what exists/missing.
+    The checks and their points live in rules.STRUCTURE_RULES.
+    hits: rules.scan(text), when the caller already has it.
     """
-    text = text.lower() # Convert to lowercase for easier searching
-    
+    if hits is None:
+        hits = scan(text)
+
     score = 0
     feedback = {
         "present": [],
         "missing": []
     }
 
-    # --- 1. CONTACT INFO CHECKS (25 Points) ---
-    
-    # Email Check (5 pts)
-    if re.search(r'[\w\.-]+@[\w\.-]+', text):
-        score += 5
-        feedback["present"].append("Email Address")
-    else:
-        feedback["missing"].append("Email Address")
-
-    # Phone Number Check (5 pts) - Matches 01x-xxxxxxx or +60
-    if re.search(r'(\+?6?01)[0-46-9]-*[0-9]{7,8}', text):
-        score += 5
-        feedback["present"].append("Phone Number")
-    else:
-        feedback["missing"].append("Phone Number")
-
-    # LinkedIn (5 pts)
-    if "linkedin.com" in text:
-        score += 5
-        feedback["present"].append("LinkedIn Profile")
-    else:
-        feedback["missing"].append("LinkedIn Profile")
-        
-    # Location (10 pts) - Checking for common Malaysian keywords
-    if any(loc in text for loc in ["malaysia", "kuala lumpur", "selangor", "penang", "johor", "kedah", "sarawak", "sabah"]):
-        score += 10
-        feedback["present"].append("Location (State/Country)")
-    else:
-        feedback["missing"].append("Location (State/Country)")
-
-
-    # --- 2. CORE SECTIONS (40 Points) ---
-    
-    # Education (15 pts)
-    if any(w in text for w in ["education", "academic", "university", "cgpa"]):
-        score += 15
-        feedback["present"].append("Education Section")
-    else:
-        feedback["missing"].append("Education Section")
-
-    # Experience/Internship (15 pts)
-    if any(w in text for w in ["experience", "internship", "employment", "work history"]):
-        score += 15
-        feedback["present"].append("Work/Internship Experience")
-    else:
-        feedback["missing"].append("Work/Internship Experience")
-
-    # Summary/Objective (10 pts)
-    if any(w in text for w in ["summary", "objective", "profile", "about me"]):
-        score += 10
-        feedback["present"].append("Professional Summary")
-    else:
-        feedback["missing"].append("Professional Summary")
-
-
-    # --- 3. SKILLS & EXTRAS (35 Points) ---
-    
-    # Technical Skills (10 pts)
-    if any(w in text for w in ["skills", "technologies", "technical", "programming", "languages"]):
-        score += 10
-        feedback["present"].append("Technical Skills")
-    else:
-        feedback["missing"].append("Technical Skills")
-        
-    # Soft Skills (5 pts)
-    if any(w in text for w in ["leadership", "communication", "teamwork", "problem solving", "soft skills"]):
-        score += 5
-        feedback["present"].append("Soft Skills")
-    else:
-        feedback["missing"].append("Soft Skills (Keywords)")
-
-    # Achievements/Awards (5 pts)
-    if any(w in text for w in ["achievement", "award", "certification", "honor"]):
-        score += 5
-        feedback["present"].append("Achievements/Certifications")
-    else:
-        feedback["missing"].append("Achievements/Certifications")
-
-    # Involvement/Co-curricular (5 pts)
-    if any(w in text for w in ["involvement", "co-curricular", "club", "society", "volunteer"]):
-        score += 5
-        feedback["present"].append("Co-curricular Activities")
-    else:
-        feedback["missing"].append("Co-curricular Activities")
-
-    # References (10 pts)
-    if "references" in text or "referees" in text:
-        score += 10
-        feedback["present"].append("References")
-    else:
-        feedback["missing"].append("References")
+    for rule in STRUCTURE_RULES:
+        if rule.contact == 'email':
+            found = hits["email_in_lowered"]
+        elif rule.contact:
+            found = hits[rule.contact] is not None
+        else:
+            found = rule.name in hits["sections"]
+
+        if found:
+            score += rule.points
+            feedback["present"].append(rule.present)
+        else:
+            feedback["missing"].append(rule.missing)
 
     return score, feedback
 
-def analyze_ats_compatibility(text, file_size_bytes):
+@timed('ats')
+def analyze_ats_compatibility(text, file_size_bytes, truncated=False, preflight=None, hits=None):
     """
     Simulates how an ATS robot reads the file.
     Checks for readability, entity parsing, and formatting issues.
+    truncated: extraction stopped at a page/size/time limit (see extract_pdf).
+    preflight: extract_pdf's pre-flight report; without it (stored text) the size heuristic decides.
+    hits: rules.scan(text), when the caller already has it.
     """
     results = {
         "is_readable": True,
+        "is_truncated": truncated,
         "parsed_info": {},
         "issues": [],
         "raw_text_preview": text[:500] + "..." # First 500 chars
     }
 
     # 1. READABILITY CHECK (The "Empty PDF" Check)
-    # If file is big (>50KB) but text is small (<100 chars), it's likely an Image/Scan.
-    if len(text.strip()) < 50 and file_size_bytes > 50000:
+    # The pre-flight already knows image-only, locked and broken files.
+    # Otherwise: if file is big (>50KB) but text is small (<50 chars), it's likely an Image/Scan.
+    kind = preflight["kind"] if preflight else None
+    if kind not in ATS_UNREADABLE_ISSUES and len(text.strip()) < 50 and file_size_bytes > 50000:
+        kind = 'scanned'
+    if kind in ATS_UNREADABLE_ISSUES:
         results["is_readable"] = False
-        results["issues"].append("CRITICAL: Text not selectable. This looks like an Image/Scan.")
+        results["issues"].append(ATS_UNREADABLE_ISSUES[kind])
         return 0, results
 
+    if hits is None:
+        hits = scan(text)
+
     # 2. ENTITY PARSING (Can the robot find your details?)
-    # Email
-    email_match = re.search(r'[\w\.-]+@[\w\.-]+', text)
-    if email_match:
-        results["parsed_info"]["email"] = email_match.group(0)
-    else:
-        results["issues"].append("Parsing Error: Could not automatically detect Email.")
-
-    # Phone
-    phone_match = re.search(r'(\+?6?01)[0-46-9]-*[0-9]{7,8}', text)
-    if phone_match:
-        results["parsed_info"]["phone"] = phone_match.group(0)
-    else:
-        results["issues"].append("Parsing Error: Could not automatically detect Phone Number.")
+    for field, issue, penalty in ATS_FIELD_RULES:
+        if hits[field] is not None:
+            results["parsed_info"][field] = hits[field]
+        else:
+            results["issues"].append(issue)
 
     # 3. FORMATTING CHECKS
-    # Check for weird characters (cid:12) which indicate font encoding errors
-    if text.count('(cid:') > 3:
-        results["issues"].append("Font Encoding Error: Your PDF uses fonts that turn into garbage text.")
-    
-    # Check for very long single lines (Parsing tables/columns wrongly)
-    lines = text.split('\n')
-    if any(len(line) > 300 for line in lines):
-        results["issues"].append("Formatting Warning: Some text lines are extremely long. Avoid complex tables.")
+    for measurement, limit, issue in ATS_FORMAT_RULES:
+        if hits[measurement] > limit:
+            results["issues"].append(issue)
+    if truncated:
+        results["issues"].append(ATS_TRUNCATED_ISSUE)
 
     # 4. SCORING
     # Start perfect, deduct for issues
     ats_score = 100
-    if not results["parsed_info"].get("email"): ats_score -= 25
-    if not results["parsed_info"].get("phone"): ats_score -= 25
+    for field, issue, penalty in ATS_FIELD_RULES:
+        if not results["parsed_info"].get(field): ats_score -= penalty
     if len(results["issues"]) > 0: ats_score -= (len(results["issues"]) * 10)
     
     return max(0, ats_score), results
 
+@timed('skills')
 def extract_skills(text):
     """
-    Simple keyword matching for demo purposes.
-    In production, use NLP (Spacy/NLTK).
+    Canonical skill names found in the text, matched on whole words against the
+    taxonomy in data/skills.json (aliases such as "JS" or "Node.js" included).
     """
-    text = text.lower()
-    skills_db = [
-        "python", "java", "javascript", "react", "node", "sql", "aws", "docker", 
-        "communication", "leadership", "excel", "html", "css", "flask", "django"
-    ]
-    
-    found_skills = []
-    for skill in skills_db:
-        if skill in text:
-            found_skills.append(skill.capitalize())
-            
-    return found_skills
-
-def match_jobs(user_skills):
+    return skill_taxonomy.extract(text)
+
+@timed('match')
+def match_jobs(user_skills, limit=None, index=None):
     """
-    Mock Job Database matching.
+    Ranks catalog postings by the share of their requirements the user has.
+    Only postings sharing a skill with the user are scored (see catalog.JobIndex).
     """
-    mock_jobs = [
-        {"id": 1, "title": "Frontend Intern", "company": "TechCorp", "req": ["React", "Javascript", "Html", "Css"]},
-        {"id": 2, "title": "Backend Intern", "company": "DataSystems", "req": ["Python", "Sql", "Flask"]},
-        {"id": 3, "title": "Fullstack Intern", "company": "StartupX", "req": ["React", "Node", "Docker"]},
-        {"id": 4, "title": "Business Analyst Intern", "company": "BizGroup", "req": ["Excel", "Communication", "Sql"]},
-        {"id": 5, "title": "Cloud Engineer Intern", "company": "CloudNet", "req": ["Aws", "Docker", "Linux"]}
-    ]
-    
-    matches = []
-    user_skills_set = set([s.lower() for s in user_skills])
-    
-    for job in mock_jobs:
-        job_req_set = set([r.lower() for r in job['req']])
-        overlap = user_skills_set.intersection(job_req_set)
-        
-        if len(overlap) > 0:
-            match_score = int((len(overlap) / len(job_req_set)) * 100)
-            matches.append({
-                "job": job,
-                "score": match_score,
-                "matched_skills": list(overlap)
-            })
-            
-    # Sort by highest match score
-    return sorted(matches, key=lambda x: x['score'], reverse=True)
\ No newline at end of file
+    return (index or job_index).match(user_skills, limit)
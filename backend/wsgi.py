@@ -0,0 +1,6 @@
+# Entry point for gunicorn and the flask CLI:
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#   flask --app wsgi init-db
+from app import create_app
+
+app = create_app()
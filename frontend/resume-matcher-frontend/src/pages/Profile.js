@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { LogOut, Calendar } from 'lucide-react';
 import { Link } from 'react-router-dom';
@@ -8,18 +8,39 @@ function Profile() {
     const { token, logout } = useAuth();
     const [profileData, setProfileData] = useState(null);
     const [error, setError] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
-    useEffect(() => {
-        fetch(`${process.env.REACT_APP_API_URL}/profile`, {
+    // /profile returns one page of resumes, newest first, plus next_cursor for the older ones
+    const fetchPage = useCallback((cursor) => {
+        const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+        return fetch(`${process.env.REACT_APP_API_URL}/profile${query}`, {
             headers: { 'Authorization': `Bearer ${token}` }
-        })
-            .then(res => {
-                if (!res.ok) throw new Error("Failed to load profile.");
-                return res.json();
+        }).then(res => {
+            if (!res.ok) throw new Error("Failed to load profile.");
+            return res.json();
+        });
+    }, [token]);
+
+    useEffect(() => {
+        fetchPage(null)
+            .then(data => {
+                setProfileData(data);
+                setNextCursor(data.next_cursor);
             })
-            .then(data => setProfileData(data))
             .catch(err => setError(err.message));
-    }, [token]);
+    }, [fetchPage]);
+
+    const loadMore = () => {
+        setLoadingMore(true);
+        fetchPage(nextCursor)
+            .then(data => {
+                setProfileData(prev => ({ ...prev, resumes: [...prev.resumes, ...data.resumes] }));
+                setNextCursor(data.next_cursor);
+            })
+            .catch(err => setError(err.message))
+            .finally(() => setLoadingMore(false));
+    };
 
     if (error) return (
         <div className="dashboard-container" style={{ textAlign: 'center', marginTop: '50px' }}>
@@ -118,6 +139,14 @@ function Profile() {
                     ))
                 )}
             </div>
+
+            {nextCursor && (
+                <div style={{ textAlign: 'center', marginTop: '1.5rem' }}>
+                    <button onClick={loadMore} className="btn-primary" disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : 'Load older resumes'}
+                    </button>
+                </div>
+            )}
         </div>
     );
 }